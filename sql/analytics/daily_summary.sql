@@ -1,16 +1,39 @@
 -- Daily transaction summary
 -- Aggregates transaction volumes and amounts by day and status.
+-- Reads the daily rollups maintained by the loader (migration 006)
+-- rather than scanning transactions.
 
 CREATE OR REPLACE VIEW analytics.daily_summary AS
+WITH totals AS (
+    SELECT
+        transaction_day,
+        status,
+        SUM(transaction_count)::BIGINT    AS transaction_count,
+        SUM(amount_cents)                 AS amount_cents,
+        COUNT(*)                          AS active_merchants
+    FROM daily_merchant_rollup
+    WHERE status IN ('completed', 'pending', 'refunded')
+    GROUP BY transaction_day, status
+),
+customers AS (
+    SELECT
+        transaction_day,
+        status,
+        COUNT(*)                          AS unique_customers
+    FROM daily_customer_keys
+    WHERE status IN ('completed', 'pending', 'refunded')
+    GROUP BY transaction_day, status
+)
 SELECT
-    DATE(t.transaction_date)              AS transaction_day,
+    t.transaction_day,
     t.status,
-    COUNT(*)                              AS transaction_count,
-    SUM(t.amount)                         AS total_amount,
-    ROUND(AVG(t.amount), 2)              AS avg_amount,
-    COUNT(DISTINCT t.merchant_id)         AS active_merchants,
-    COUNT(DISTINCT t.customer_id)         AS unique_customers
-FROM transactions t
-WHERE t.status IN ('completed', 'pending', 'refunded')
-GROUP BY DATE(t.transaction_date), t.status
-ORDER BY transaction_day DESC, t.status;
+    t.transaction_count,
+    ROUND(t.amount_cents / 100.0, 2)                        AS total_amount,
+    ROUND(t.amount_cents / 100.0 / t.transaction_count, 2)  AS avg_amount,
+    t.active_merchants,
+    COALESCE(c.unique_customers, 0)                         AS unique_customers
+FROM totals t
+LEFT JOIN customers c
+    ON c.transaction_day = t.transaction_day
+   AND c.status = t.status
+ORDER BY t.transaction_day DESC, t.status;
@@ -1,26 +1,36 @@
 -- Weekly merchant performance report
 -- Shows gross amount, refunds, and net amount per merchant per week.
+-- Aggregates by (week, merchant_id) before joining merchants, so the
+-- grouping matches idx_transactions_week_merchant.
 
 CREATE OR REPLACE VIEW analytics.weekly_merchant_report AS
+WITH weekly AS (
+    SELECT
+        DATE_TRUNC('week', t.transaction_date)::DATE   AS week,
+        t.merchant_id,
+        COUNT(t.transaction_id)                         AS transaction_count,
+        SUM(t.amount)                                   AS gross_amount,
+        COALESCE(SUM(r.amount), 0)                      AS total_refunds,
+        COUNT(DISTINCT t.customer_id)                   AS unique_customers
+    FROM transactions t
+    LEFT JOIN refunds r
+        ON r.transaction_id = t.transaction_id
+    WHERE t.status IN ('completed', 'refunded')
+    GROUP BY
+        DATE_TRUNC('week', t.transaction_date)::DATE,
+        t.merchant_id
+)
 SELECT
-    DATE_TRUNC('week', t.transaction_date)::DATE   AS week,
+    w.week,
     m.merchant_id,
     m.merchant_name,
     m.category,
-    COUNT(t.transaction_id)                         AS transaction_count,
-    SUM(t.amount)                                   AS gross_amount,
-    COALESCE(SUM(r.amount), 0)                      AS total_refunds,
-    SUM(t.amount) - COALESCE(SUM(r.amount), 0)      AS net_amount,
-    COUNT(DISTINCT t.customer_id)                    AS unique_customers
-FROM transactions t
+    w.transaction_count,
+    w.gross_amount,
+    w.total_refunds,
+    w.gross_amount - w.total_refunds                AS net_amount,
+    w.unique_customers
+FROM weekly w
 JOIN merchants m
-    ON m.merchant_id = t.merchant_id
-LEFT JOIN refunds r
-    ON r.transaction_id = t.transaction_id
-WHERE t.status IN ('completed', 'refunded')
-GROUP BY
-    DATE_TRUNC('week', t.transaction_date)::DATE,
-    m.merchant_id,
-    m.merchant_name,
-    m.category
+    ON m.merchant_id = w.merchant_id
 ORDER BY week DESC, gross_amount DESC;
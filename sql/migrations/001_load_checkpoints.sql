@@ -0,0 +1,11 @@
+-- Load checkpoints
+-- Tracks how far a chunked transaction load has committed, so an
+-- interrupted run can resume at the first uncommitted chunk.
+
+CREATE TABLE IF NOT EXISTS load_checkpoints (
+    source_file  VARCHAR(255) PRIMARY KEY,
+    byte_offset  BIGINT NOT NULL,
+    rows_loaded  BIGINT NOT NULL,
+    completed    BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at   TIMESTAMP DEFAULT NOW()
+);
@@ -0,0 +1,22 @@
+-- File work queue
+-- Shared queue of landing files for multi-node ingestion. Workers claim
+-- pending rows with FOR UPDATE SKIP LOCKED and heartbeat while loading.
+
+CREATE TABLE IF NOT EXISTS file_queue (
+    id            BIGSERIAL PRIMARY KEY,
+    file_name     VARCHAR(255) NOT NULL UNIQUE,
+    file_type     VARCHAR(20) NOT NULL,
+    status        VARCHAR(20) NOT NULL DEFAULT 'pending',
+    claimed_by    VARCHAR(255),
+    claimed_at    TIMESTAMP,
+    heartbeat_at  TIMESTAMP,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    last_error    TEXT,
+    enqueued_at   TIMESTAMP DEFAULT NOW(),
+    finished_at   TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_file_queue_pending
+    ON file_queue(id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_file_queue_claimed
+    ON file_queue(heartbeat_at) WHERE status = 'claimed';
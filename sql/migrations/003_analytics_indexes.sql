@@ -0,0 +1,38 @@
+-- Analytics indexes
+-- Composite, covering and expression indexes matched to the access paths
+-- of the views in sql/analytics/, so they can be answered from
+-- index-only scans instead of sequential scans of transactions.
+--
+-- Index-only scans on expression indexes need the underlying column in
+-- the index as well, hence transaction_date in the INCLUDE lists.
+-- Plain CREATE INDEX blocks writes to the table while it builds; run
+-- this outside load windows on large tables.
+
+BEGIN;
+
+-- Per-merchant aggregates (merchant_performance): ordered by merchant
+-- and date, covering every column the view reads.
+CREATE INDEX IF NOT EXISTS idx_transactions_merchant_date
+    ON transactions (merchant_id, transaction_date)
+    INCLUDE (amount, status, customer_id, transaction_id);
+
+-- Weekly merchant rollups (weekly_merchant_report)
+CREATE INDEX IF NOT EXISTS idx_transactions_week_merchant
+    ON transactions ((DATE_TRUNC('week', transaction_date)::DATE), merchant_id)
+    INCLUDE (transaction_id, amount, customer_id, transaction_date)
+    WHERE status IN ('completed', 'refunded');
+
+-- Refund lookups by transaction, covering the refunded amount
+CREATE INDEX IF NOT EXISTS idx_refunds_transaction_amount
+    ON refunds (transaction_id)
+    INCLUDE (refund_id, amount);
+
+-- Superseded by the indexes above (same leading column)
+DROP INDEX IF EXISTS idx_transactions_merchant;
+DROP INDEX IF EXISTS idx_refunds_transaction;
+
+COMMIT;
+
+-- Index-only scans rely on the visibility map being current
+VACUUM (ANALYZE) transactions;
+VACUUM (ANALYZE) refunds;
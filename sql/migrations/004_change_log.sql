@@ -0,0 +1,31 @@
+-- Change log
+-- Append-only outbox with one entry per loaded batch, written in the same
+-- transaction as the rows it describes. Downstream consumers tail this
+-- table instead of polling transactions on created_at.
+--
+-- Consumers should track progress by txid rather than batch_id: batch
+-- IDs are allocated before commit, so a lower ID can become visible after
+-- a higher one. Every entry with txid below the snapshot xmin belongs to
+-- a finished transaction, so reading
+--
+--     SELECT * FROM change_log
+--     WHERE txid >= :last_xmin
+--       AND txid <  pg_snapshot_xmin(pg_current_snapshot())
+--     ORDER BY batch_id;
+--
+-- and then storing that xmin as :last_xmin returns every entry once.
+-- Rows for an entry are found with a primary key range scan between
+-- key_min and key_max. Other batches' keys can fall inside the range.
+
+CREATE TABLE IF NOT EXISTS change_log (
+    batch_id     BIGSERIAL PRIMARY KEY,
+    table_name   VARCHAR(63) NOT NULL,
+    source_file  VARCHAR(255),
+    key_min      VARCHAR(36) NOT NULL,
+    key_max      VARCHAR(36) NOT NULL,
+    row_count    INTEGER NOT NULL,
+    txid         XID8 NOT NULL DEFAULT pg_current_xact_id(),
+    logged_at    TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_log_txid ON change_log(txid);
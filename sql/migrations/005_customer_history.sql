@@ -0,0 +1,64 @@
+-- Customer change tracking
+-- row_hash fingerprints the tracked customer attributes so re-sent,
+-- unchanged customers can be skipped without comparing every column.
+-- customer_history keeps one row per version of a customer when the
+-- loader runs with CUSTOMER_MERGE_MODE=scd2; the open version has a NULL
+-- valid_to.
+
+ALTER TABLE customers ADD COLUMN IF NOT EXISTS row_hash BIGINT;
+
+-- Must match pipeline.transforms.customer_row_hash: the attributes joined
+-- with a unit separator, NULLs as \N, and the first 8 bytes of the MD5
+-- read as a signed BIGINT.
+CREATE OR REPLACE FUNCTION customer_row_hash(
+    merchant_id TEXT, email TEXT, first_name TEXT, last_name TEXT, country TEXT
+) RETURNS BIGINT
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT ('x' || left(md5(concat_ws(E'\x1f',
+        COALESCE(merchant_id, '\N'),
+        COALESCE(email, '\N'),
+        COALESCE(first_name, '\N'),
+        COALESCE(last_name, '\N'),
+        COALESCE(country, '\N')
+    )), 16))::bit(64)::bigint;
+$$;
+
+-- Backfill so the first merge skips unchanged customers
+UPDATE customers
+SET row_hash = customer_row_hash(merchant_id, email, first_name, last_name, country)
+WHERE row_hash IS NULL;
+
+CREATE TABLE IF NOT EXISTS customer_history (
+    customer_id  VARCHAR(36) NOT NULL REFERENCES customers(customer_id),
+    merchant_id  VARCHAR(36),
+    email        VARCHAR(200),
+    first_name   VARCHAR(100),
+    last_name    VARCHAR(100),
+    country      VARCHAR(2),
+    created_at   DATE,
+    row_hash     BIGINT,
+    valid_from   TIMESTAMPTZ NOT NULL,
+    valid_to     TIMESTAMPTZ,
+    PRIMARY KEY (customer_id, valid_from)
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_customer_history_open
+    ON customer_history(customer_id)
+    WHERE valid_to IS NULL;
+
+-- Existing customers become the first version, valid from creation
+INSERT INTO customer_history
+    (customer_id, merchant_id, email, first_name, last_name,
+     country, created_at, row_hash, valid_from)
+SELECT customer_id, merchant_id, email, first_name, last_name,
+       country, created_at, row_hash, COALESCE(created_at, NOW())
+FROM customers
+ON CONFLICT DO NOTHING;
+
+-- Versions seeded before the backfill existed
+UPDATE customer_history h
+SET row_hash = c.row_hash
+FROM customers c
+WHERE h.customer_id = c.customer_id
+  AND h.valid_to IS NULL
+  AND h.row_hash IS NULL;
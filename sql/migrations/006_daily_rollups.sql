@@ -0,0 +1,67 @@
+-- Daily rollups
+-- Pre-aggregated transaction totals maintained by the loader in the same
+-- transaction as each load (see pipeline/rollups.py). daily_summary
+-- reads these instead of scanning transactions, and its distinct counts
+-- become row counts:
+--   active_merchants  = rows in daily_merchant_rollup per (day, status)
+--   unique_customers  = rows in daily_customer_keys per (day, status)
+--
+-- Changes made to transactions outside the pipeline (e.g. status
+-- updates) are not tracked; run SELECT rebuild_daily_rollups(); after
+-- such changes.
+
+CREATE TABLE IF NOT EXISTS daily_merchant_rollup (
+    transaction_day    DATE NOT NULL,
+    merchant_id        VARCHAR(36) NOT NULL,
+    status             VARCHAR(20) NOT NULL,
+    transaction_count  BIGINT NOT NULL,
+    amount_cents       BIGINT NOT NULL,
+    PRIMARY KEY (transaction_day, merchant_id, status)
+);
+
+CREATE TABLE IF NOT EXISTS daily_customer_keys (
+    transaction_day  DATE NOT NULL,
+    status           VARCHAR(20) NOT NULL,
+    customer_id      VARCHAR(36) NOT NULL,
+    PRIMARY KEY (transaction_day, status, customer_id)
+);
+
+-- Rebuild both rollups from transactions. Table names are resolved on
+-- the search_path, so this also works in scratch schemas.
+CREATE OR REPLACE FUNCTION rebuild_daily_rollups() RETURNS void
+LANGUAGE sql AS $$
+    TRUNCATE daily_merchant_rollup, daily_customer_keys;
+
+    INSERT INTO daily_merchant_rollup
+        (transaction_day, merchant_id, status, transaction_count, amount_cents)
+    SELECT
+        DATE(transaction_date),
+        merchant_id,
+        status,
+        COUNT(*),
+        COALESCE(SUM(ROUND(amount * 100)), 0)::BIGINT
+    FROM transactions
+    WHERE transaction_date IS NOT NULL
+      AND merchant_id IS NOT NULL
+      AND status IS NOT NULL
+    GROUP BY DATE(transaction_date), merchant_id, status;
+
+    INSERT INTO daily_customer_keys (transaction_day, status, customer_id)
+    SELECT DISTINCT DATE(transaction_date), status, customer_id
+    FROM transactions
+    WHERE transaction_date IS NOT NULL
+      AND status IS NOT NULL
+      AND customer_id IS NOT NULL;
+$$;
+
+-- Backfill once, when the rollups are first created
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM daily_merchant_rollup) THEN
+        PERFORM rebuild_daily_rollups();
+    END IF;
+END
+$$;
+
+ANALYZE daily_merchant_rollup;
+ANALYZE daily_customer_keys;
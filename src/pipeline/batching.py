@@ -0,0 +1,111 @@
+"""Adaptive batch sizing for database inserts.
+
+Adjusts the number of rows sent per INSERT statement based on the
+observed round-trip time and statement size of previous batches.
+"""
+
+import logging
+from dataclasses import dataclass
+
+from pipeline.config import config
+
+logger = logging.getLogger(__name__)
+
+# Largest factor the batch size may grow or shrink by after one batch
+MAX_STEP = 2.0
+
+
+@dataclass(frozen=True)
+class BatchObservation:
+    """Measurements from one executed batch."""
+
+    rows: int
+    seconds: float
+    nbytes: int
+
+
+class BatchSizer:
+    """Chooses batch sizes that converge on a target latency.
+
+    After each batch the next size is the row count that would have taken
+    the target latency at the observed per-row cost, limited to a change
+    of ``MAX_STEP`` from the current size, clamped to the configured row
+    bounds, and capped so that a single statement stays under the byte
+    ceiling. The byte cap wins over ``min_size`` when rows are wide.
+    Sizing on per-row cost keeps a short final batch from shrinking the
+    size for the next file.
+    """
+
+    def __init__(
+        self,
+        initial_size: int | None = None,
+        min_size: int | None = None,
+        max_size: int | None = None,
+        target_seconds: float | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.min_size = min_size or config.batch_min_size
+        self.max_size = max_size or config.batch_max_size
+        self.target_seconds = target_seconds or config.batch_target_seconds
+        self.max_bytes = max_bytes or config.batch_max_bytes
+        self.size = self._clamp(initial_size or config.batch_size)
+        self.history: list[BatchObservation] = []
+
+    def record(self, rows: int, seconds: float, nbytes: int) -> int:
+        """Record a completed batch and compute the next batch size.
+
+        Args:
+            rows: Rows in the batch.
+            seconds: Round-trip time of the statement.
+            nbytes: Size of the statement sent.
+
+        Returns:
+            The next batch size.
+        """
+        self.history.append(BatchObservation(rows, seconds, nbytes))
+        if rows == 0:
+            return self.size
+
+        if seconds > 0:
+            ideal = rows * self.target_seconds / seconds
+        else:
+            ideal = self.size * MAX_STEP
+        ideal = max(self.size / MAX_STEP, min(self.size * MAX_STEP, ideal))
+
+        bytes_per_row = max(nbytes / rows, 1)
+        byte_cap = int(self.max_bytes / bytes_per_row)
+
+        self.size = max(1, min(self._clamp(int(ideal)), byte_cap))
+        logger.debug(
+            "Batch of %d rows took %.3fs (%d bytes); next size %d",
+            rows,
+            seconds,
+            nbytes,
+            self.size,
+        )
+        return self.size
+
+    def summary(self) -> dict:
+        """Summarise the batches executed so far.
+
+        Returns:
+            Counts, chosen sizes and mean latency, for run metrics.
+        """
+        if not self.history:
+            return {"batches": 0, "rows": 0}
+
+        sizes = [obs.rows for obs in self.history]
+        return {
+            "batches": len(self.history),
+            "rows": sum(sizes),
+            "min_size": min(sizes),
+            "max_size": max(sizes),
+            "last_size": sizes[-1],
+            "next_size": self.size,
+            "mean_seconds": sum(o.seconds for o in self.history) / len(sizes),
+            "bytes": sum(o.nbytes for o in self.history),
+        }
+
+    def _clamp(self, size: int) -> int:
+        """Clamp a batch size to the configured bounds."""
+        return max(self.min_size, min(self.max_size, size))
@@ -0,0 +1,261 @@
+"""Transparent decompression of landing files.
+
+Opens gzip, zstd and bz2 files as plain binary streams that the CSV and
+JSON parsers read from directly; decompressed bytes are never written to
+disk. Formats whose compressed block boundaries can be found without
+decompressing are decompressed in parallel:
+
+- BGZF gzip (as written by ``bgzip``), where every member records its
+  own compressed size in the header.
+- The zstd seekable format, which ends with a table of frame sizes.
+
+Other files are decompressed as a single stream. zlib and zstandard
+release the GIL while decompressing, so the parallel path uses threads.
+"""
+
+import bz2
+import gzip
+import io
+import logging
+import struct
+import zlib
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO
+
+from pipeline.config import config
+from pipeline.exceptions import IngestionError
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b\x08"
+GZIP_FEXTRA = 0x04
+
+ZSTD_SKIPPABLE_SEEK_TABLE = 0x184D2A5E
+ZSTD_SEEKABLE_MAGIC = 0x8F92EAB1
+ZSTD_SEEK_FOOTER_SIZE = 9
+
+# A block spec: (compressed offset, compressed size, decompressed size or 0)
+Block = tuple[int, int, int]
+
+
+def open_compressed(filepath: Path) -> BinaryIO:
+    """Open a landing file as a decompressed binary stream.
+
+    Args:
+        filepath: Path to a plain or compressed file.
+
+    Returns:
+        Readable binary stream of the decompressed contents.
+
+    Raises:
+        IngestionError: If the format needs a library that is not installed.
+    """
+    suffix = filepath.suffix.lower()
+    if suffix == ".gz":
+        blocks = _bgzf_blocks(filepath)
+        if blocks is not None:
+            return _parallel_reader(filepath, blocks, _inflate_gzip_member)
+        return gzip.open(filepath, "rb")
+
+    if suffix == ".bz2":
+        return bz2.open(filepath, "rb")
+
+    if suffix == ".zst":
+        zstandard = _import_zstandard(filepath)
+        blocks = _zstd_seekable_frames(filepath)
+        if blocks is not None:
+            return _parallel_reader(filepath, blocks, _zstd_frame_decoder(zstandard))
+        # The raw reader supports neither readline() nor iteration, and
+        # stops at the first frame unless told to read across them
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            open(filepath, "rb"), read_across_frames=True, closefd=True
+        )
+        return io.BufferedReader(reader, buffer_size=1 << 20)
+
+    return open(filepath, "rb")
+
+
+def is_compressed(filepath: Path) -> bool:
+    """Return True if the file has a supported compression suffix."""
+    return filepath.suffix.lower() in config.compression_suffixes
+
+
+class _OrderedBlockReader(io.RawIOBase):
+    """Raw stream over blocks decompressed concurrently, returned in order.
+
+    At most ``workers * 2`` blocks are in flight or buffered at a time,
+    which bounds memory regardless of file size.
+    """
+
+    def __init__(
+        self,
+        filepath: Path,
+        blocks: list[Block],
+        decompress: Callable[[bytes, int], bytes],
+        workers: int,
+    ):
+        self._file = open(filepath, "rb")
+        self._decompress = decompress
+        self._blocks = iter(blocks)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="decompress"
+        )
+        self._pending = deque()
+        self._window = workers * 2
+        self._current = memoryview(b"")
+        self._fill()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._current:
+            if not self._pending:
+                return 0
+            self._current = memoryview(self._pending.popleft().result())
+            self._fill()
+        n = min(len(buffer), len(self._current))
+        buffer[:n] = self._current[:n]
+        self._current = self._current[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=True)
+            self._file.close()
+        super().close()
+
+    def _fill(self) -> None:
+        """Submit blocks until the in-flight window is full."""
+        while len(self._pending) < self._window:
+            block = next(self._blocks, None)
+            if block is None:
+                return
+            offset, size, decompressed_size = block
+            self._file.seek(offset)
+            data = self._file.read(size)
+            self._pending.append(
+                self._executor.submit(self._decompress, data, decompressed_size)
+            )
+
+
+def _parallel_reader(
+    filepath: Path,
+    blocks: list[Block],
+    decompress: Callable[[bytes, int], bytes],
+) -> BinaryIO:
+    """Wrap a block list in a buffered, ordered parallel reader."""
+    workers = max(1, config.decompress_workers)
+    logger.info(
+        "Decompressing %s: %d blocks across %d threads",
+        filepath.name,
+        len(blocks),
+        workers,
+    )
+    raw = _OrderedBlockReader(filepath, blocks, decompress, workers)
+    return io.BufferedReader(raw, buffer_size=1 << 20)
+
+
+def _bgzf_blocks(filepath: Path) -> list[Block] | None:
+    """List the members of a BGZF file, or None if it is not BGZF.
+
+    Each BGZF member carries a 'BC' extra subfield holding its total
+    size, so members can be located by reading headers only.
+    """
+    blocks = []
+    size = filepath.stat().st_size
+    with open(filepath, "rb") as f:
+        offset = 0
+        while offset < size:
+            f.seek(offset)
+            header = f.read(12)
+            if len(header) < 12 or not header.startswith(GZIP_MAGIC):
+                return None
+            if not header[3] & GZIP_FEXTRA:
+                return None
+            (xlen,) = struct.unpack("<H", header[10:12])
+            block_size = _bgzf_block_size(f.read(xlen))
+            if block_size is None:
+                return None
+            blocks.append((offset, block_size, 0))
+            offset += block_size
+    return blocks or None
+
+
+def _bgzf_block_size(extra: bytes) -> int | None:
+    """Find the BGZF block size in a gzip extra field."""
+    pos = 0
+    while pos + 4 <= len(extra):
+        subfield_id = extra[pos:pos + 2]
+        (slen,) = struct.unpack("<H", extra[pos + 2:pos + 4])
+        if subfield_id == b"BC" and slen == 2:
+            (bsize,) = struct.unpack("<H", extra[pos + 4:pos + 6])
+            return bsize + 1
+        pos += 4 + slen
+    return None
+
+
+def _inflate_gzip_member(data: bytes, _size: int) -> bytes:
+    """Decompress one complete gzip member."""
+    return zlib.decompress(data, wbits=31)
+
+
+def _zstd_seekable_frames(filepath: Path) -> list[Block] | None:
+    """Read the seek table of a zstd seekable file, or None if absent."""
+    size = filepath.stat().st_size
+    if size < ZSTD_SEEK_FOOTER_SIZE:
+        return None
+
+    with open(filepath, "rb") as f:
+        f.seek(size - ZSTD_SEEK_FOOTER_SIZE)
+        frame_count, descriptor, magic = struct.unpack("<IBI", f.read(9))
+        if magic != ZSTD_SEEKABLE_MAGIC:
+            return None
+
+        entry_size = 12 if descriptor & 0x80 else 8
+        table_size = frame_count * entry_size
+        table_start = size - ZSTD_SEEK_FOOTER_SIZE - table_size
+        if table_start < 8:
+            return None
+        f.seek(table_start - 8)
+        skippable_magic, _ = struct.unpack("<II", f.read(8))
+        if skippable_magic != ZSTD_SKIPPABLE_SEEK_TABLE:
+            return None
+        table = f.read(table_size)
+
+    blocks = []
+    offset = 0
+    for i in range(frame_count):
+        compressed, decompressed = struct.unpack_from("<II", table, i * entry_size)
+        blocks.append((offset, compressed, decompressed))
+        offset += compressed
+    return blocks or None
+
+
+def _zstd_frame_decoder(zstandard) -> Callable[[bytes, int], bytes]:
+    """Return a function that decompresses one zstd frame.
+
+    Decompressor objects are not thread-safe, so each call makes its own.
+    """
+    def decode(data: bytes, size: int) -> bytes:
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=size)
+
+    return decode
+
+
+def _import_zstandard(filepath: Path):
+    """Import the optional zstandard dependency."""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise IngestionError(
+            "Reading .zst files requires the 'zstandard' package "
+            "(install payments-pipeline[zstd])",
+            file_path=str(filepath),
+        ) from e
+    return zstandard
@@ -36,9 +36,105 @@ class PipelineConfig:
     batch_size: int = 500
     timezone: str = "UTC"
 
-    # File patterns
+    # Adaptive insert batching (batch_size is the starting size)
+    batch_min_size: int = 100
+    batch_max_size: int = 50_000
+    batch_target_seconds: float = 0.5
+    batch_max_bytes: int = 16 * 1024 * 1024
+
+    # Loads of at least this many rows, and at least this fraction of
+    # the table's current size, defer index and FK maintenance until the
+    # data is in (threshold 0 = off)
+    bulk_load_threshold: int = field(
+        default_factory=lambda: int(os.getenv("BULK_LOAD_THRESHOLD", "0"))
+    )
+    bulk_load_min_fraction: float = field(
+        default_factory=lambda: float(os.getenv("BULK_LOAD_MIN_FRACTION", "0.5"))
+    )
+    bulk_maintenance_work_mem: str = "512MB"
+
+    # Plain CSVs at least this large are parsed across processes
+    parallel_csv_min_bytes: int = field(
+        default_factory=lambda: int(
+            os.getenv("PARALLEL_CSV_MIN_BYTES", str(256 * 1024 * 1024))
+        )
+    )
+    parallel_csv_workers: int = field(
+        default_factory=lambda: int(
+            os.getenv("PARALLEL_CSV_WORKERS", str(os.cpu_count() or 1))
+        )
+    )
+
+    # Records per batch when streaming customer JSON
+    json_batch_size: int = 10_000
+
+    # Rows per committed chunk for resumable transaction loads (0 = off)
+    checkpoint_rows: int = field(
+        default_factory=lambda: int(os.getenv("CHECKPOINT_ROWS", "0"))
+    )
+
+    # Publish an entry to change_log for every loaded batch
+    change_log_enabled: bool = field(
+        default_factory=lambda: os.getenv("CHANGE_LOG", "1").lower()
+        in ("1", "true", "yes")
+    )
+
+    # How customer files are merged into customers: "insert" (new rows
+    # only), "update" (overwrite changed rows) or "scd2" (overwrite and
+    # keep every version in customer_history)
+    customer_merge_mode: str = field(
+        default_factory=lambda: os.getenv("CUSTOMER_MERGE_MODE", "insert")
+    )
+
+    # In-process retries of files that fail transiently; the delay
+    # doubles after each attempt
+    max_retries: int = field(
+        default_factory=lambda: int(os.getenv("PIPELINE_MAX_RETRIES", "3"))
+    )
+    retry_backoff_seconds: float = field(
+        default_factory=lambda: float(
+            os.getenv("PIPELINE_RETRY_BACKOFF_SECONDS", "1.0")
+        )
+    )
+
+    # Per-stage profiling: output directory (unset = off) and the
+    # fraction of files to profile
+    profile_dir: Path | None = field(
+        default_factory=lambda: (
+            Path(os.environ["PIPELINE_PROFILE_DIR"])
+            if os.getenv("PIPELINE_PROFILE_DIR")
+            else None
+        )
+    )
+    profile_sample_rate: float = field(
+        default_factory=lambda: float(
+            os.getenv("PIPELINE_PROFILE_SAMPLE_RATE", "1.0")
+        )
+    )
+
+    # Multi-node work queue
+    queue_mode: bool = field(
+        default_factory=lambda: os.getenv("PIPELINE_QUEUE_MODE", "").lower()
+        in ("1", "true", "yes")
+    )
+    worker_id: str = field(
+        default_factory=lambda: os.getenv("PIPELINE_WORKER_ID", "")
+    )
+    heartbeat_seconds: int = 30
+    claim_timeout_seconds: int = 300
+    max_claim_attempts: int = 3
+
+    # File patterns (each also matches the compressed suffixes below)
     transaction_pattern: str = "transactions_*.csv"
     customer_pattern: str = "customers_*.json"
+    compression_suffixes: list[str] = field(
+        default_factory=lambda: [".gz", ".zst", ".bz2"]
+    )
+    decompress_workers: int = field(
+        default_factory=lambda: int(
+            os.getenv("DECOMPRESS_WORKERS", str(os.cpu_count() or 1))
+        )
+    )
 
     # Expected schemas
     transaction_columns: list[str] = field(default_factory=lambda: [
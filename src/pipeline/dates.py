@@ -0,0 +1,115 @@
+"""Date parsing for incoming data files.
+
+Detects the datetime format of a column from a small sample, caches it
+per source and schema, and parses the full column with an exact-format
+vectorised path. Falls back to pandas inference when a column does not
+match its detected format.
+"""
+
+import logging
+
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+from pipeline.config import config
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_SIZE = 100
+
+
+class DateParser:
+    """Parses datetime columns using cached, inferred formats.
+
+    Formats are keyed by (source, schema, column) so that every file from
+    the same feed reuses the format detected on the first one. A source
+    that changes format is detected on the next parse and re-inferred.
+    """
+
+    def __init__(self, timezone: str | None = None):
+        self.timezone = timezone or config.timezone
+        self._formats: dict[tuple, str | None] = {}
+
+    def parse(
+        self,
+        series: pd.Series,
+        source: str | None = None,
+        schema: tuple[str, ...] = (),
+    ) -> pd.Series:
+        """Parse a column to timezone-aware datetimes.
+
+        Args:
+            series: Raw column values.
+            source: Feed the column came from (e.g. 'transactions').
+            schema: Column names of the frame, used to key the cache.
+
+        Returns:
+            Datetime series in the configured timezone.
+        """
+        key = (source, schema, series.name)
+        if key not in self._formats:
+            self._formats[key] = self._detect_format(series)
+            logger.debug("Detected format %r for %s", self._formats[key], key)
+
+        fmt = self._formats[key]
+        parsed = None
+        if fmt is not None:
+            try:
+                parsed = pd.to_datetime(series, format=fmt)
+            except (ValueError, TypeError):
+                logger.warning(
+                    "Column '%s' no longer matches format %r; re-inferring",
+                    series.name,
+                    fmt,
+                )
+                del self._formats[key]
+
+        if parsed is None:
+            parsed = pd.to_datetime(series)
+
+        return self._localize(parsed)
+
+    def clear(self) -> None:
+        """Forget all cached formats."""
+        self._formats.clear()
+
+    def _detect_format(self, series: pd.Series) -> str | None:
+        """Infer a single strftime format that fits a sample of the column.
+
+        Args:
+            series: Raw column values.
+
+        Returns:
+            The format string, or None if no single format fits the sample.
+        """
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return None
+
+        sample = series.dropna().head(SAMPLE_SIZE)
+        if sample.empty or not isinstance(sample.iloc[0], str):
+            return None
+
+        fmt = guess_datetime_format(sample.iloc[0])
+        if fmt is None:
+            return None
+
+        try:
+            pd.to_datetime(sample, format=fmt)
+        except (ValueError, TypeError):
+            return None
+        return fmt
+
+    def _localize(self, parsed: pd.Series) -> pd.Series:
+        """Attach or convert to the configured timezone.
+
+        Naive timestamps are taken to be in the configured timezone;
+        timestamps carrying an offset are converted to it. Around DST
+        changes, wall-clock times that occur twice are read as standard
+        time, and times skipped by the clock change move forward to the
+        first valid instant, so these valid rows do not fail the file.
+        """
+        if parsed.dt.tz is None:
+            return parsed.dt.tz_localize(
+                self.timezone, ambiguous=False, nonexistent="shift_forward"
+            )
+        return parsed.dt.tz_convert(self.timezone)
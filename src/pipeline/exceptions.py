@@ -35,3 +35,58 @@ class LoadError(PipelineError):
     def __init__(self, message: str, table: str | None = None, **kwargs):
         super().__init__(message, kwargs)
         self.table = table
+
+
+class ClaimLostError(PipelineError):
+    """Raised when another worker has taken over a queued file's claim."""
+
+    def __init__(self, message: str, file_path: str | None = None, **kwargs):
+        super().__init__(message, kwargs)
+        self.file_path = file_path
+
+
+# SQLSTATE classes and codes for failures that can succeed on retry
+TRANSIENT_SQLSTATE_CLASSES = frozenset({
+    "08",  # connection exception
+})
+TRANSIENT_SQLSTATES = frozenset({
+    "40001",  # serialization_failure
+    "40P01",  # deadlock_detected
+    "53300",  # too_many_connections
+    "55P03",  # lock_not_available
+    "57014",  # query_canceled (statement or lock timeout)
+    "57P01",  # admin_shutdown
+})
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Return True if a failure is worth retrying.
+
+    Walks the exception chain, so a ``LoadError`` raised from a psycopg2
+    error is classified by that error. Errors the server reported are
+    classified by SQLSTATE. Client-side operational and interface errors
+    (e.g. a dropped connection) are transient. Everything else, such as
+    schema and data errors, is permanent.
+
+    Args:
+        exc: The exception raised while processing a file.
+
+    Returns:
+        True for transient failures, False for permanent ones.
+    """
+    import psycopg2
+
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if isinstance(exc, psycopg2.Error):
+            if exc.pgcode:
+                return (
+                    exc.pgcode in TRANSIENT_SQLSTATES
+                    or exc.pgcode[:2] in TRANSIENT_SQLSTATE_CLASSES
+                )
+            return isinstance(
+                exc, (psycopg2.OperationalError, psycopg2.InterfaceError)
+            )
+        exc = exc.__cause__ or exc.__context__
+    return False
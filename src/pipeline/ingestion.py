@@ -1,20 +1,54 @@
 """File ingestion module.
 
 Handles reading and parsing of data files from the landing directory.
-Supports CSV (transactions) and JSON (customers) formats.
+Supports CSV (transactions) and JSON (customers) formats, plain or
+compressed with gzip, zstd or bz2.
 """
 
+import io
 import json
 import logging
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import pandas as pd
 
+from pipeline.compression import is_compressed, open_compressed
 from pipeline.config import config
 from pipeline.exceptions import IngestionError
+from pipeline.parallel_csv import read_csv_parallel
+from pipeline.utils import with_compression_suffixes
+
+if TYPE_CHECKING:
+    from pipeline.work_queue import WorkQueue
 
 logger = logging.getLogger(__name__)
 
+# Characters decoded per read when streaming JSON
+JSON_READ_SIZE = 1 << 20
+
+# Errors raised while reading a possibly compressed stream: I/O and
+# parse errors, truncated gzip/bz2 input, and corrupt deflate data
+READ_ERRORS = (OSError, EOFError, ValueError, zlib.error)
+
+# A decode error this close to the end of the buffer may just be a token
+# cut off by the block boundary (e.g. "tru", "-Infin", "\u00"), so more
+# input is read before giving up
+JSON_TOKEN_SLACK = 16
+
+
+@dataclass
+class CsvChunk:
+    """A parsed slice of a CSV file and where it sits in the file."""
+
+    frame: pd.DataFrame
+    start_offset: int
+    end_offset: int
+
 
 class FileIngestor:
     """Reads and parses data files from the landing directory.
@@ -29,8 +63,12 @@ class FileIngestor:
     def ingest_csv(self, filepath: Path) -> pd.DataFrame:
         """Read a CSV file into a DataFrame.
 
+        Compressed files are decompressed on the fly into the parser.
+        Plain files of at least ``config.parallel_csv_min_bytes`` are
+        parsed across several processes with identical results.
+
         Args:
-            filepath: Path to the CSV file.
+            filepath: Path to the CSV file, optionally compressed.
 
         Returns:
             Parsed DataFrame.
@@ -40,7 +78,16 @@ class FileIngestor:
         """
         logger.info("Ingesting CSV: %s", filepath.name)
         try:
-            df = pd.read_csv(filepath)
+            if is_compressed(filepath):
+                with open_compressed(filepath) as f:
+                    df = pd.read_csv(f)
+            elif (
+                config.parallel_csv_workers > 1
+                and filepath.stat().st_size >= config.parallel_csv_min_bytes
+            ):
+                df = read_csv_parallel(filepath)
+            else:
+                df = pd.read_csv(filepath)
             logger.info("Read %d rows from %s", len(df), filepath.name)
             return df
         except Exception as e:
@@ -49,8 +96,57 @@ class FileIngestor:
                 file_path=str(filepath),
             ) from e
 
+    def iter_csv_chunks(
+        self, filepath: Path, chunk_rows: int, start_offset: int = 0
+    ) -> Iterator[CsvChunk]:
+        """Read a CSV file in fixed-size row chunks.
+
+        Each chunk records the byte range it was read from, so a resumed
+        load can seek straight past rows that are already committed
+        without reading or parsing them again. Records must not contain
+        embedded newlines. Offsets into compressed files refer to the
+        decompressed stream; resuming one decompresses, but does not
+        parse, the committed prefix.
+
+        Args:
+            filepath: Path to the CSV file, optionally compressed.
+            chunk_rows: Maximum number of data rows per chunk.
+            start_offset: Byte offset to resume from. Offsets inside the
+                header row are treated as the start of the data.
+
+        Yields:
+            Parsed chunks in file order.
+
+        Raises:
+            IngestionError: If the file cannot be read or parsed.
+        """
+        logger.info(
+            "Ingesting CSV in chunks of %d rows: %s (from byte %d)",
+            chunk_rows,
+            filepath.name,
+            start_offset,
+        )
+        try:
+            with open_compressed(filepath) as f:
+                header = f.readline()
+                offset = len(header)
+                if start_offset > offset:
+                    _skip_to(f, start_offset - offset)
+                    offset = start_offset
+
+                while lines := list(islice(f, chunk_rows)):
+                    data = b"".join(lines)
+                    frame = pd.read_csv(io.BytesIO(header + data))
+                    yield CsvChunk(frame, offset, offset + len(data))
+                    offset += len(data)
+        except READ_ERRORS as e:
+            raise IngestionError(
+                f"Failed to read CSV chunk: {filepath.name}",
+                file_path=str(filepath),
+            ) from e
+
     def ingest_json(self, filepath: Path) -> pd.DataFrame:
-        """Read a JSON array file into a DataFrame.
+        """Read a JSON array or newline-delimited JSON file into a DataFrame.
 
         Args:
             filepath: Path to the JSON file.
@@ -61,38 +157,70 @@ class FileIngestor:
         Raises:
             IngestionError: If the file cannot be read or parsed.
         """
-        logger.info("Ingesting JSON: %s", filepath.name)
-        try:
-            with open(filepath, "r") as f:
-                data = json.load(f)
+        batches = list(self.iter_json_batches(filepath))
+        if not batches:
+            return pd.DataFrame()
+        return pd.concat(batches, ignore_index=True)
 
-            if not isinstance(data, list):
-                raise IngestionError(
-                    f"Expected JSON array, got {type(data).__name__}",
-                    file_path=str(filepath),
-                )
+    def iter_json_batches(
+        self, filepath: Path, batch_size: int | None = None
+    ) -> Iterator[pd.DataFrame]:
+        """Read a JSON file incrementally in fixed-size record batches.
 
-            df = pd.DataFrame(data)
-            logger.info("Read %d rows from %s", len(df), filepath.name)
-            return df
+        Accepts either a top-level array of objects or newline-delimited
+        JSON (one object per line). The file is decoded a block at a time
+        and each batch is built column by column, so neither the whole
+        file nor a list of per-record dicts is held in memory.
+
+        Args:
+            filepath: Path to the JSON file, optionally compressed.
+            batch_size: Records per batch (defaults to
+                ``config.json_batch_size``).
+
+        Yields:
+            One DataFrame per batch, in file order.
+
+        Raises:
+            IngestionError: If the file cannot be read or parsed.
+        """
+        batch_size = batch_size or config.json_batch_size
+        logger.info("Ingesting JSON: %s", filepath.name)
+        rows = 0
+        try:
+            with io.TextIOWrapper(open_compressed(filepath)) as f:
+                records = _iter_json_records(f, filepath)
+                while (batch := _records_to_frame(records, batch_size)) is not None:
+                    rows += len(batch)
+                    yield batch
         except json.JSONDecodeError as e:
             raise IngestionError(
                 f"Invalid JSON in {filepath.name}",
                 file_path=str(filepath),
             ) from e
+        except READ_ERRORS as e:
+            raise IngestionError(
+                f"Failed to read JSON: {filepath.name}",
+                file_path=str(filepath),
+            ) from e
+        logger.info("Read %d rows from %s", rows, filepath.name)
 
-    def discover_files(self) -> dict[str, list[Path]]:
+    def discover_files(
+        self, queue: "WorkQueue | None" = None
+    ) -> dict[str, list[Path]]:
         """Find all data files in the landing directory.
 
+        Args:
+            queue: Optional work queue to enqueue the files into, for
+                coordinated processing across several workers.
+
+        Compressed files (e.g. 'transactions_20240115.csv.gz') are
+        discovered alongside plain ones.
+
         Returns:
             Dictionary mapping file type to list of file paths.
         """
-        transaction_files = sorted(
-            self.landing_dir.glob(config.transaction_pattern)
-        )
-        customer_files = sorted(
-            self.landing_dir.glob(config.customer_pattern)
-        )
+        transaction_files = self._glob(config.transaction_pattern)
+        customer_files = self._glob(config.customer_pattern)
 
         logger.info(
             "Discovered %d transaction files, %d customer files",
@@ -100,7 +228,157 @@ class FileIngestor:
             len(customer_files),
         )
 
-        return {
+        files = {
             "transactions": transaction_files,
             "customers": customer_files,
         }
+        if queue is not None:
+            queue.enqueue(files)
+        return files
+
+    def _glob(self, pattern: str) -> list[Path]:
+        """Find files matching a pattern or any compressed variant of it."""
+        return sorted(
+            path
+            for variant in with_compression_suffixes(pattern)
+            for path in self.landing_dir.glob(variant)
+        )
+
+
+def _skip_to(f, count: int) -> None:
+    """Advance a binary stream by count bytes, seeking where possible."""
+    if f.seekable():
+        f.seek(count, io.SEEK_CUR)
+        return
+    while count > 0:
+        block = f.read(min(count, 1 << 20))
+        if not block:
+            return
+        count -= len(block)
+
+
+def _iter_json_records(f, filepath: Path) -> Iterator[dict]:
+    """Decode JSON objects one at a time from a text stream.
+
+    Handles a single top-level array of objects or a sequence of
+    whitespace-separated objects (newline-delimited JSON).
+
+    Args:
+        f: Open text stream.
+        filepath: Path of the stream, for error messages.
+
+    Yields:
+        Each decoded record.
+
+    Raises:
+        IngestionError: If the top level is not an array or objects.
+        json.JSONDecodeError: If the content is not valid JSON.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        block = f.read(JSON_READ_SIZE)
+        if not block:
+            eof = True
+            return False
+        buf = buf[pos:] + block
+        pos = 0
+        return True
+
+    def next_char() -> str:
+        """Skip whitespace and return the next character ('' at EOF)."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+
+    first = next_char()
+    in_array = first == "["
+    if in_array:
+        pos += 1
+    elif first not in ("{", ""):
+        raise IngestionError(
+            f"Expected JSON array or objects in {filepath.name}",
+            file_path=str(filepath),
+        )
+
+    expect_value = True
+    while True:
+        char = next_char()
+        if in_array and char == "]":
+            pos += 1
+            if next_char():
+                raise json.JSONDecodeError("Extra data", buf, pos)
+            return
+        if char == "":
+            if in_array:
+                raise json.JSONDecodeError("Unterminated array", buf, pos)
+            return
+        if in_array and not expect_value:
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            pos += 1
+            expect_value = True
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            # Only a record cut off by the end of the buffer is worth
+            # reading more for; an error inside the buffer is malformed
+            # input, and refilling would pull the rest of the file in.
+            truncated = (
+                e.pos >= len(buf) - JSON_TOKEN_SLACK
+                or e.msg.startswith("Unterminated string")
+            )
+            if truncated and fill():
+                continue
+            raise
+
+        if not isinstance(record, dict):
+            raise IngestionError(
+                f"Expected JSON object records, got {type(record).__name__}",
+                file_path=str(filepath),
+            )
+        pos = end
+        expect_value = False
+        yield record
+
+
+def _records_to_frame(records: Iterator[dict], limit: int) -> pd.DataFrame | None:
+    """Build a DataFrame column by column from the next records of a stream.
+
+    Each record's values are appended to the column lists as it is
+    decoded, so the batch is never held as a list of dicts. Columns
+    appear in the order their keys are first seen; records missing a key
+    get None in that column.
+
+    Args:
+        records: Stream of decoded records.
+        limit: Maximum number of records to take.
+
+    Returns:
+        The batch, or None if the stream is exhausted.
+    """
+    columns: dict[str, list] = {}
+    n = -1
+    for n, record in enumerate(islice(records, limit)):
+        if record.keys() != columns.keys():
+            for key in record:
+                if key not in columns:
+                    columns[key] = [None] * n
+        for key, values in columns.items():
+            values.append(record.get(key))
+    if n < 0:
+        return None
+    return pd.DataFrame(columns, index=pd.RangeIndex(n + 1))
@@ -5,35 +5,113 @@ batch inserts, and post-load tracking.
 """
 
 import logging
+import time
+from collections.abc import Iterable
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
 
 import pandas as pd
 import psycopg2
+from psycopg2 import sql
 from psycopg2.extras import execute_values
 
+from pipeline.batching import BatchSizer
 from pipeline.config import config
 from pipeline.exceptions import LoadError
+from pipeline.rollups import (
+    CUSTOMER_KEY_COLUMNS,
+    MERCHANT_ROLLUP_COLUMNS,
+    compute_daily_rollups,
+)
 
 logger = logging.getLogger(__name__)
 
 PROCESSED_LOG = Path("processed_files.log")
 
+TRANSACTION_COLUMNS = [
+    "transaction_id", "merchant_id", "customer_id",
+    "amount", "transaction_date", "status", "payment_method",
+]
+CUSTOMER_COLUMNS = [
+    "customer_id", "merchant_id", "email",
+    "first_name", "last_name", "country", "created_at", "row_hash",
+]
+CUSTOMER_MERGE_MODES = ("insert", "update", "scd2")
+
+MERCHANT_ROLLUP_UPSERT = f"""
+    INSERT INTO daily_merchant_rollup ({', '.join(MERCHANT_ROLLUP_COLUMNS)})
+    VALUES %s
+    ON CONFLICT (transaction_day, merchant_id, status) DO UPDATE SET
+        transaction_count = daily_merchant_rollup.transaction_count
+                            + EXCLUDED.transaction_count,
+        amount_cents      = daily_merchant_rollup.amount_cents
+                            + EXCLUDED.amount_cents
+"""
+CUSTOMER_KEYS_INSERT = f"""
+    INSERT INTO daily_customer_keys ({', '.join(CUSTOMER_KEY_COLUMNS)})
+    VALUES %s
+    ON CONFLICT DO NOTHING
+"""
+
+# Applied to changed customers in "update" and "scd2" modes. The WHERE
+# clause also skips rows another worker has already brought up to date.
+CUSTOMER_UPSERT = """
+    ON CONFLICT (customer_id) DO UPDATE SET
+        merchant_id = EXCLUDED.merchant_id,
+        email       = EXCLUDED.email,
+        first_name  = EXCLUDED.first_name,
+        last_name   = EXCLUDED.last_name,
+        country     = EXCLUDED.country,
+        row_hash    = EXCLUDED.row_hash
+    WHERE customers.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+"""
+
+
+@dataclass(frozen=True)
+class KeyRange:
+    """Rows written by one insert statement and their key bounds."""
+
+    rows: int
+    key_min: str | None
+    key_max: str | None
+    keys: list[str] | None = None
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """Progress of a checkpointed file load."""
+
+    byte_offset: int
+    rows_loaded: int
+    completed: bool
+
 
 class DatabaseLoader:
     """Loads DataFrames into PostgreSQL tables.
 
     Handles connection management, batch inserts, and tracks
-    which files have been successfully processed.
+    which files have been successfully processed. Insert batch sizes are
+    tuned across the run by a shared ``BatchSizer``.
     """
 
     def __init__(self, database_url: str | None = None):
         self.database_url = database_url or config.database_url
+        self.batch_sizer = BatchSizer()
         self._conn = None
 
     def connect(self):
-        """Establish database connection."""
+        """Establish database connection.
+
+        The session timezone is set to ``config.timezone`` so that
+        timezone-aware timestamps are stored in the same zone they were
+        parsed in.
+        """
         try:
-            self._conn = psycopg2.connect(self.database_url)
+            self._conn = psycopg2.connect(
+                self.database_url,
+                options=f"-c timezone={config.timezone}",
+            )
             logger.info("Connected to database")
         except psycopg2.Error as e:
             raise LoadError(f"Failed to connect to database: {e}") from e
@@ -48,6 +126,13 @@ class DatabaseLoader:
     def load_transactions(self, df: pd.DataFrame, source_file: str) -> int:
         """Load transaction data into the transactions table.
 
+        Large loads relative to the table may use bulk mode, which defers
+        index and foreign key maintenance until all rows are in (see
+        ``_use_bulk_mode`` and ``_deferred_maintenance``).
+
+        The daily rollups are updated in the same transaction (see
+        ``pipeline.rollups``).
+
         Args:
             df: Transformed transaction DataFrame.
             source_file: Name of the source file (for tracking).
@@ -61,26 +146,34 @@ class DatabaseLoader:
         if self._conn is None:
             raise LoadError("Not connected to database")
 
-        logger.info("Loading %d transactions from %s", len(df), source_file)
-
-        columns = [
-            "transaction_id", "merchant_id", "customer_id",
-            "amount", "transaction_date", "status", "payment_method",
-        ]
-
         try:
             with self._conn.cursor() as cur:
-                values = [
-                    tuple(row[col] for col in columns)
-                    for _, row in df.iterrows()
-                ]
-
-                insert_sql = f"""
-                    INSERT INTO transactions
-                        ({', '.join(columns)})
-                    VALUES %s
-                """
-                execute_values(cur, insert_sql, values, page_size=config.batch_size)
+                bulk = self._use_bulk_mode(cur, "transactions", len(df))
+                logger.info(
+                    "Loading %d transactions from %s%s",
+                    len(df),
+                    source_file,
+                    " (bulk mode)" if bulk else "",
+                )
+                if bulk:
+                    with self._deferred_maintenance(cur, "transactions"):
+                        written = self._insert_rows(
+                            cur,
+                            "transactions",
+                            TRANSACTION_COLUMNS,
+                            df,
+                            key="transaction_id",
+                        )
+                else:
+                    written = self._insert_rows(
+                        cur,
+                        "transactions",
+                        TRANSACTION_COLUMNS,
+                        df,
+                        key="transaction_id",
+                    )
+                self._upsert_rollups(cur, df)
+                self._publish_change(cur, "transactions", source_file, written)
 
             self._conn.commit()
             self._log_processed(source_file)
@@ -104,37 +197,74 @@ class DatabaseLoader:
         Returns:
             Number of rows inserted.
 
+        Raises:
+            LoadError: If the database operation fails.
+        """
+        return self.load_customer_batches([df], source_file)
+
+    def load_customer_batches(
+        self, batches: Iterable[pd.DataFrame], source_file: str
+    ) -> int:
+        """Load a stream of customer batches in a single transaction.
+
+        Batches are consumed as they are produced, so only one is held in
+        memory at a time. If the stream raises, nothing from the file is
+        committed.
+
+        ``config.customer_merge_mode`` controls how existing customers
+        are handled:
+
+        - ``insert``: every row is inserted; re-sent customers fail.
+        - ``update``: rows whose ``row_hash`` differs from the stored
+          one are updated in place; unchanged rows are not written.
+        - ``scd2``: as ``update``, and each change also closes the
+          customer's open row in ``customer_history`` and adds a new one.
+
+        Args:
+            batches: Transformed customer DataFrames.
+            source_file: Name of the source file (for tracking).
+
+        Returns:
+            Number of rows inserted or updated.
+
         Raises:
             LoadError: If the database operation fails.
         """
         if self._conn is None:
             raise LoadError("Not connected to database")
 
-        logger.info("Loading %d customers from %s", len(df), source_file)
+        mode = config.customer_merge_mode
+        if mode not in CUSTOMER_MERGE_MODES:
+            raise LoadError(
+                f"Unknown customer merge mode '{mode}'", table="customers"
+            )
 
-        columns = [
-            "customer_id", "merchant_id", "email",
-            "first_name", "last_name", "country", "created_at",
-        ]
+        logger.info("Loading customers from %s (%s mode)", source_file, mode)
+        loaded = 0
+        unchanged = 0
 
         try:
             with self._conn.cursor() as cur:
-                values = [
-                    tuple(row[col] for col in columns)
-                    for _, row in df.iterrows()
-                ]
-
-                insert_sql = f"""
-                    INSERT INTO customers
-                        ({', '.join(columns)})
-                    VALUES %s
-                """
-                execute_values(cur, insert_sql, values, page_size=config.batch_size)
+                for df in batches:
+                    if mode == "insert":
+                        written = self._insert_rows(
+                            cur, "customers", CUSTOMER_COLUMNS, df, key="customer_id"
+                        )
+                    else:
+                        written = self._merge_customers(cur, df, mode == "scd2")
+                    self._publish_change(cur, "customers", source_file, written)
+                    rows = sum(w.rows for w in written)
+                    loaded += rows
+                    unchanged += len(df) - rows
 
             self._conn.commit()
             self._log_processed(source_file)
-            logger.info("Successfully loaded %d customers", len(df))
-            return len(df)
+            logger.info(
+                "Successfully loaded %d customers (%d unchanged)",
+                loaded,
+                unchanged,
+            )
+            return loaded
 
         except psycopg2.Error as e:
             self._conn.rollback()
@@ -142,6 +272,461 @@ class DatabaseLoader:
                 f"Failed to load customers: {e}",
                 table="customers",
             ) from e
+        except Exception:
+            self._conn.rollback()
+            raise
+
+    def get_checkpoint(self, source_file: str) -> Checkpoint | None:
+        """Return the recorded progress of a checkpointed load.
+
+        Args:
+            source_file: Name of the source file.
+
+        Returns:
+            The checkpoint, or None if the file has never been started.
+
+        Raises:
+            LoadError: If the database operation fails.
+        """
+        if self._conn is None:
+            raise LoadError("Not connected to database")
+
+        try:
+            with self._conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT byte_offset, rows_loaded, completed
+                    FROM load_checkpoints
+                    WHERE source_file = %s
+                    """,
+                    (source_file,),
+                )
+                row = cur.fetchone()
+            self._conn.commit()
+        except psycopg2.Error as e:
+            self._conn.rollback()
+            raise LoadError(
+                f"Failed to read checkpoint: {e}",
+                table="load_checkpoints",
+            ) from e
+
+        return Checkpoint(*row) if row else None
+
+    def load_transaction_chunk(
+        self, df: pd.DataFrame, source_file: str, end_offset: int
+    ) -> int:
+        """Load one chunk of a file and advance its checkpoint.
+
+        The rows and the new checkpoint are committed in the same
+        transaction, so a restarted run resumes exactly after the last
+        chunk that reached the database.
+
+        Args:
+            df: Transformed transaction chunk.
+            source_file: Name of the source file.
+            end_offset: Byte offset in the source file just past this chunk.
+
+        Returns:
+            Number of rows inserted.
+
+        Raises:
+            LoadError: If the database operation fails.
+        """
+        if self._conn is None:
+            raise LoadError("Not connected to database")
+
+        logger.info(
+            "Loading %d transactions from %s up to byte %d",
+            len(df),
+            source_file,
+            end_offset,
+        )
+
+        try:
+            with self._conn.cursor() as cur:
+                written = self._insert_rows(
+                    cur, "transactions", TRANSACTION_COLUMNS, df, key="transaction_id"
+                )
+                self._upsert_rollups(cur, df)
+                self._publish_change(cur, "transactions", source_file, written)
+                cur.execute(
+                    """
+                    INSERT INTO load_checkpoints
+                        (source_file, byte_offset, rows_loaded)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (source_file) DO UPDATE SET
+                        byte_offset = EXCLUDED.byte_offset,
+                        rows_loaded = load_checkpoints.rows_loaded
+                                      + EXCLUDED.rows_loaded,
+                        updated_at  = NOW()
+                    """,
+                    (source_file, end_offset, len(df)),
+                )
+
+            self._conn.commit()
+            return len(df)
+
+        except psycopg2.Error as e:
+            self._conn.rollback()
+            raise LoadError(
+                f"Failed to load transaction chunk: {e}",
+                table="transactions",
+            ) from e
+
+    def complete_checkpoint(self, source_file: str) -> None:
+        """Mark a checkpointed load as finished.
+
+        Args:
+            source_file: Name of the source file.
+
+        Raises:
+            LoadError: If the database operation fails.
+        """
+        if self._conn is None:
+            raise LoadError("Not connected to database")
+
+        try:
+            with self._conn.cursor() as cur:
+                cur.execute(
+                    """
+                    INSERT INTO load_checkpoints
+                        (source_file, byte_offset, rows_loaded, completed)
+                    VALUES (%s, 0, 0, TRUE)
+                    ON CONFLICT (source_file) DO UPDATE SET
+                        completed  = TRUE,
+                        updated_at = NOW()
+                    """,
+                    (source_file,),
+                )
+            self._conn.commit()
+        except psycopg2.Error as e:
+            self._conn.rollback()
+            raise LoadError(
+                f"Failed to complete checkpoint: {e}",
+                table="load_checkpoints",
+            ) from e
+
+        self._log_processed(source_file)
+
+    def _merge_customers(
+        self, cur, df: pd.DataFrame, keep_history: bool
+    ) -> list[KeyRange]:
+        """Write the new and changed customers in a batch.
+
+        Stored hashes for the whole batch are fetched in one query, and
+        only rows whose ``row_hash`` is new or different are sent back.
+        The upsert skips rows that another load wrote in the meantime,
+        so history follows the IDs it returned rather than the rows sent.
+
+        Args:
+            cur: Open cursor in the current transaction.
+            df: Transformed customer batch, including ``row_hash``.
+            keep_history: Also record the changes in ``customer_history``.
+
+        Returns:
+            Key ranges of the rows written.
+        """
+        df = df.drop_duplicates("customer_id", keep="last")
+        ids = df["customer_id"].tolist()
+        cur.execute(
+            "SELECT customer_id, row_hash FROM customers WHERE customer_id = ANY(%s)",
+            (ids,),
+        )
+        stored = dict(cur.fetchall())
+        changed = df[
+            [stored.get(cid, None) != h for cid, h in zip(ids, df["row_hash"])]
+        ]
+        if changed.empty:
+            return []
+
+        written = self._insert_rows(
+            cur,
+            "customers",
+            CUSTOMER_COLUMNS,
+            changed,
+            CUSTOMER_UPSERT,
+            key="customer_id",
+            return_keys=keep_history,
+        )
+        if keep_history:
+            written_ids = [cid for w in written for cid in w.keys or []]
+            if written_ids:
+                self._record_customer_history(cur, written_ids)
+        return written
+
+    def _record_customer_history(self, cur, customer_ids: list[str]) -> None:
+        """Close the open history rows of customers and add their new versions.
+
+        New versions are copied from ``customers``, which already holds
+        the rows just written, so only the IDs are sent. Both statements
+        use one timestamp, so each closed row ends where its successor
+        starts.
+
+        Args:
+            cur: Open cursor in the current transaction.
+            customer_ids: Customers that were just inserted or updated.
+        """
+        cur.execute("SELECT clock_timestamp()")
+        (now,) = cur.fetchone()
+        cur.execute(
+            """
+            UPDATE customer_history SET valid_to = %s
+            WHERE customer_id = ANY(%s) AND valid_to IS NULL
+            """,
+            (now, customer_ids),
+        )
+        cur.execute(
+            """
+            INSERT INTO customer_history
+                (customer_id, merchant_id, email, first_name, last_name,
+                 country, created_at, row_hash, valid_from)
+            SELECT customer_id, merchant_id, email, first_name, last_name,
+                   country, created_at, row_hash, %s
+            FROM customers
+            WHERE customer_id = ANY(%s)
+            """,
+            (now, customer_ids),
+        )
+
+    def _upsert_rollups(self, cur, df: pd.DataFrame) -> None:
+        """Merge a transaction batch's daily rollups into the rollup tables.
+
+        Runs in the caller's transaction, so the rollups always match
+        the committed transactions.
+
+        Args:
+            cur: Open cursor in the current transaction.
+            df: Transformed transactions being loaded.
+        """
+        rollups = compute_daily_rollups(df)
+        for statement, frame in (
+            (MERCHANT_ROLLUP_UPSERT, rollups.merchant_totals),
+            (CUSTOMER_KEYS_INSERT, rollups.customer_keys),
+        ):
+            if not frame.empty:
+                execute_values(
+                    cur,
+                    statement,
+                    list(frame.itertuples(index=False, name=None)),
+                    page_size=config.batch_max_size,
+                )
+
+    def _publish_change(
+        self, cur, table: str, source_file: str, written: list[KeyRange]
+    ) -> None:
+        """Append a change_log entry describing a loaded batch.
+
+        Runs in the caller's transaction, so the entry becomes visible
+        exactly when the rows do. Each insert statement already returned
+        its own key bounds (see ``_insert_rows``), so only those bounds
+        are sent back to combine. They are compared in Postgres, so the
+        range follows the collation of the primary key index.
+
+        Args:
+            cur: Open cursor in the current transaction.
+            table: Table the batch was loaded into.
+            source_file: Name of the source file.
+            written: Key ranges returned by the batch's insert statements.
+        """
+        rows = sum(w.rows for w in written)
+        if not config.change_log_enabled or rows == 0:
+            return
+
+        bounds = [
+            key for w in written if w.rows for key in (w.key_min, w.key_max)
+        ]
+        cur.execute(
+            """
+            INSERT INTO change_log
+                (table_name, source_file, key_min, key_max, row_count)
+            SELECT %s, %s, MIN(k), MAX(k), %s
+            FROM unnest(%s::text[]) AS k
+            """,
+            (table, source_file, rows, bounds),
+        )
+
+    def _use_bulk_mode(self, cur, table: str, rows: int) -> bool:
+        """Decide whether a load is large enough to defer maintenance.
+
+        Rebuilding indexes and revalidating foreign keys costs a pass
+        over the whole table, under a lock that blocks readers. It only
+        pays off when the load is a large share of the table, so bulk
+        mode needs at least ``config.bulk_load_threshold`` rows and at
+        least ``config.bulk_load_min_fraction`` of the table's estimated
+        row count (``pg_class.reltuples``).
+
+        Args:
+            cur: Open cursor in the current transaction.
+            table: Table being loaded.
+            rows: Rows about to be inserted.
+
+        Returns:
+            True if the load should use ``_deferred_maintenance``.
+        """
+        if not 0 < config.bulk_load_threshold <= rows:
+            return False
+
+        cur.execute(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+            (table,),
+        )
+        (reltuples,) = cur.fetchone()
+        # reltuples is -1 for a table that has never been analyzed
+        existing = max(reltuples, 0)
+        return rows >= config.bulk_load_min_fraction * existing
+
+    @contextmanager
+    def _deferred_maintenance(self, cur, table: str):
+        """Drop secondary indexes and foreign keys around a bulk insert.
+
+        Index and constraint definitions are read from the catalog, dropped
+        before the block, and recreated after it: each index is rebuilt in
+        a single sort and each foreign key is validated in a single join
+        rather than per row. The primary key is kept so duplicates are
+        still rejected as they arrive.
+
+        All of this runs inside the caller's transaction. Postgres DDL is
+        transactional, so if the load fails the rollback restores every
+        index and constraint exactly as it was. The drops take an ACCESS
+        EXCLUSIVE lock on the table until commit, so readers of the table
+        wait for the load to finish.
+
+        Args:
+            cur: Open cursor in the current transaction.
+            table: Table being loaded.
+        """
+        cur.execute(
+            """
+            SELECT c.relname, pg_get_indexdef(i.indexrelid)
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE i.indrelid = %s::regclass
+              AND NOT i.indisprimary
+              AND NOT i.indisunique
+            """,
+            (table,),
+        )
+        indexes = cur.fetchall()
+        cur.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = %s::regclass
+              AND contype = 'f'
+            """,
+            (table,),
+        )
+        foreign_keys = cur.fetchall()
+
+        logger.info(
+            "Deferring %d index(es) and %d foreign key(s) on %s",
+            len(indexes),
+            len(foreign_keys),
+            table,
+        )
+        for name, _ in indexes:
+            cur.execute(sql.SQL("DROP INDEX {}").format(sql.Identifier(name)))
+        for name, _ in foreign_keys:
+            cur.execute(
+                sql.SQL("ALTER TABLE {} DROP CONSTRAINT {}").format(
+                    sql.Identifier(table), sql.Identifier(name)
+                )
+            )
+
+        yield
+
+        started = time.perf_counter()
+        cur.execute(
+            "SET LOCAL maintenance_work_mem = %s",
+            (config.bulk_maintenance_work_mem,),
+        )
+        for _, definition in indexes:
+            cur.execute(definition)
+        for name, definition in foreign_keys:
+            cur.execute(
+                sql.SQL("ALTER TABLE {} ADD CONSTRAINT {} ").format(
+                    sql.Identifier(table), sql.Identifier(name)
+                )
+                + sql.SQL(definition)
+            )
+        cur.execute(sql.SQL("ANALYZE {}").format(sql.Identifier(table)))
+        logger.info(
+            "Rebuilt indexes and validated constraints on %s in %.1fs",
+            table,
+            time.perf_counter() - started,
+        )
+
+    def _insert_rows(
+        self,
+        cur,
+        table: str,
+        columns: list[str],
+        df: pd.DataFrame,
+        on_conflict: str = "",
+        key: str | None = None,
+        return_keys: bool = False,
+    ) -> list[KeyRange]:
+        """Batch-insert the given columns of a DataFrame.
+
+        Each batch is converted to tuples only when it is sent, so at
+        most one batch of parameters is held at a time. It is sent as
+        one statement, timed, and fed back to the batch sizer to choose
+        the size of the next one.
+
+        With ``key``, each statement also reports how many rows it wrote
+        and their smallest and largest key. These are computed by the
+        server from ``RETURNING``, so the keys are never sent back.
+        Rows an ``ON CONFLICT`` clause skipped are not counted. With
+        ``return_keys``, the written keys are returned as well.
+
+        Args:
+            cur: Open cursor in the current transaction.
+            table: Target table name.
+            columns: Columns to insert, in order.
+            df: Rows to insert.
+            on_conflict: Optional ``ON CONFLICT`` clause for the insert.
+            key: Key column to report ranges for.
+            return_keys: Also return every written key. Requires ``key``.
+
+        Returns:
+            One key range per statement, or an empty list without ``key``.
+        """
+        insert_sql = f"""
+            INSERT INTO {table}
+                ({', '.join(columns)})
+            VALUES %s
+            {on_conflict}
+        """
+        if key is not None:
+            keys = ", array_agg(key)" if return_keys else ""
+            insert_sql = f"""
+                WITH written AS ({insert_sql} RETURNING {key} AS key)
+                SELECT COUNT(*), MIN(key), MAX(key){keys} FROM written
+            """
+        written = []
+        start = 0
+        while start < len(df):
+            batch = [
+                tuple(row[col] for col in columns)
+                for _, row in df.iloc[start:start + self.batch_sizer.size].iterrows()
+            ]
+            started = time.perf_counter()
+            result = execute_values(
+                cur,
+                insert_sql,
+                batch,
+                page_size=len(batch),
+                fetch=key is not None,
+            )
+            if key is not None:
+                written.extend(KeyRange(*row) for row in result)
+            self.batch_sizer.record(
+                len(batch),
+                time.perf_counter() - started,
+                len(cur.query or b""),
+            )
+            start += len(batch)
+        return written
 
     def _log_processed(self, filename: str) -> None:
         """Record a successfully processed file.
@@ -4,32 +4,77 @@ Orchestrates the full ingestion pipeline: discovery, validation,
 transformation, and loading of data files.
 
 Usage:
-    python -m pipeline.main
+    python -m pipeline.main [--log-level LEVEL]
+
+Startup is kept cheap for frequent scheduled runs: only the config and
+utility modules are imported at module level. pandas, psycopg2 and the
+processing modules are imported inside ``run_pipeline`` once there is at
+least one file to process.
 """
 
+import argparse
 import logging
 import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING
 
 from pipeline.config import config
-from pipeline.ingestion import FileIngestor
-from pipeline.loader import DatabaseLoader
-from pipeline.transforms import TransformPipeline
-from pipeline.validation import SchemaValidator
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+from pipeline.utils import list_files, with_compression_suffixes
+
+if TYPE_CHECKING:
+    import threading
+    from collections.abc import Iterator
+
+    import pandas as pd
+
+    from pipeline.ingestion import FileIngestor
+    from pipeline.loader import DatabaseLoader
+    from pipeline.profiling import StageProfiler
+    from pipeline.report import FileResult, RunReport
+    from pipeline.transforms import TransformPipeline
+    from pipeline.validation import SchemaValidator
+    from pipeline.work_queue import WorkQueue
+
 logger = logging.getLogger(__name__)
 
 
-def run_pipeline() -> None:
+def has_pending_files() -> bool:
+    """Check the landing directory for files matching any known pattern.
+
+    Returns:
+        True if at least one file is waiting to be processed.
+    """
+    return any(
+        list_files(config.landing_dir, pattern)
+        for base in (config.transaction_pattern, config.customer_pattern)
+        for pattern in with_compression_suffixes(base)
+    )
+
+
+def run_pipeline() -> "RunReport":
     """Execute the full ingestion pipeline.
 
     Discovers files in the landing directory, validates, transforms,
-    and loads them into the database.
+    and loads them into the database. In queue mode the discovered files
+    are enqueued and this worker processes whichever files it claims.
+    Files that fail transiently are retried (see ``process_with_retries``)
+    and, in queue mode, then returned to the queue. If the database
+    cannot be reached, the run stops and the report records the error.
+
+    Returns:
+        Report of what happened to each file.
     """
+    from datetime import datetime
+
+    from pipeline.exceptions import PipelineError, is_transient
+    from pipeline.ingestion import FileIngestor
+    from pipeline.loader import DatabaseLoader
+    from pipeline.profiling import StageProfiler
+    from pipeline.report import RunReport
+    from pipeline.transforms import TransformPipeline
+    from pipeline.validation import SchemaValidator
+
     logger.info("Starting ingestion pipeline")
     logger.info("Landing directory: %s", config.landing_dir)
 
@@ -37,65 +82,481 @@ def run_pipeline() -> None:
     validator = SchemaValidator()
     transformer = TransformPipeline()
     loader = DatabaseLoader()
-
-    files = ingestor.discover_files()
-    total_loaded = 0
-    errors = 0
+    profiler = StageProfiler()
+    queue = None
+    report = RunReport()
 
     try:
-        loader.connect()
+        if config.queue_mode:
+            from pipeline.work_queue import WorkQueue
 
-        # Process transaction files
-        for filepath in files["transactions"]:
-            try:
-                df = ingestor.ingest_csv(filepath)
+            queue = WorkQueue()
+            connect_with_retries(queue)
+            ingestor.discover_files(queue)
+            queue.release_stale()
+            work = queue.iter_claims(config.landing_dir)
+        else:
+            files = ingestor.discover_files()
+            work = [
+                (filepath, file_type)
+                for file_type in ("transactions", "customers")
+                for filepath in files[file_type]
+            ]
 
-                if not validator.validate(df, "transactions"):
-                    logger.warning("Skipping %s: validation failed", filepath.name)
-                    continue
+        connect_with_retries(loader)
 
-                transformed = transformer.transform_transactions(df)
-                count = loader.load_transactions(transformed, filepath.name)
-                total_loaded += count
-                logger.info("✓ Loaded %s (%d rows)", filepath.name, count)
+        for filepath, file_type in work:
+            with (
+                queue.keep_alive(filepath) if queue else nullcontext()
+            ) as claim_lost:
+                result = process_with_retries(
+                    filepath, file_type,
+                    ingestor, validator, transformer, loader, profiler,
+                    claim_lost,
+                )
+            report.files.append(result)
 
-            except Exception:
-                logger.error("Failed to process %s. Check file format.", filepath.name)
-                errors += 1
-                continue
+            if queue and result.status == "loaded":
+                queue.complete(filepath)
+            elif queue and result.transient:
+                queue.retry_later(filepath, result.error)
+            elif queue and result.status != "reclaimed":
+                # A reclaimed file is finished by the worker that took it
+                queue.fail(filepath, result.error or "validation failed")
+
+    except PipelineError as e:
+        report.error_class = type(e).__name__
+        report.error = str(e)
+        report.transient = is_transient(e)
+        logger.error(
+            "Pipeline run stopped (%s): %s",
+            "transient" if report.transient else "permanent",
+            e,
+        )
+    finally:
+        loader.close()
+        if queue:
+            queue.close()
+        report.finished_at = datetime.now()
+        report.batching = loader.batch_sizer.summary()
+
+    logger.info(
+        "Pipeline complete: %d rows loaded, %d errors",
+        report.rows_loaded,
+        len(report.failed),
+    )
+    logger.info("Insert batching: %s", report.batching)
 
-        # Process customer files
-        for filepath in files["customers"]:
-            try:
-                df = ingestor.ingest_json(filepath)
+    if report.failed:
+        logger.warning("Pipeline finished with %d error(s)", len(report.failed))
+    return report
 
-                if not validator.validate(df, "customers"):
-                    logger.warning("Skipping %s: validation failed", filepath.name)
-                    continue
 
-                transformed = transformer.transform_customers(df)
-                count = loader.load_customers(transformed, filepath.name)
-                total_loaded += count
-                logger.info("✓ Loaded %s (%d rows)", filepath.name, count)
+def connect_with_retries(client: "DatabaseLoader | WorkQueue") -> None:
+    """Connect a database client, retrying transient failures.
 
-            except Exception:
-                logger.error("Failed to process %s. Check file format.", filepath.name)
-                errors += 1
+    Uses the same limit and backoff as ``process_with_retries``.
+
+    Args:
+        client: Loader or work queue to connect.
+
+    Raises:
+        LoadError: If the connection still fails after the retries, or
+            fails permanently.
+    """
+    import time
+
+    from pipeline.exceptions import is_transient
+
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            client.connect()
+            return
+        except Exception as e:
+            if not is_transient(e) or attempt > config.max_retries:
+                raise
+            delay = config.retry_backoff_seconds * 2 ** (attempt - 1)
+            logger.warning(
+                "Failed to connect (attempt %d of %d): %s. Retrying in %.1fs",
+                attempt,
+                config.max_retries + 1,
+                e,
+                delay,
+            )
+            time.sleep(delay)
+
+
+def process_with_retries(
+    filepath: Path,
+    file_type: str,
+    ingestor: "FileIngestor",
+    validator: "SchemaValidator",
+    transformer: "TransformPipeline",
+    loader: "DatabaseLoader",
+    profiler: "StageProfiler",
+    claim_lost: "threading.Event | None" = None,
+) -> "FileResult":
+    """Process a file, retrying transient failures.
+
+    Transient failures (see ``is_transient``) are retried up to
+    ``config.max_retries`` times on a fresh connection, after a delay
+    that starts at ``config.retry_backoff_seconds`` and doubles each
+    time. Loads are transactional, so a retried file never leaves
+    partial rows behind, and checkpointed loads resume where they
+    stopped. Permanent failures are not retried. A file whose queue
+    claim was taken over is reported as ``"reclaimed"``, since another
+    worker is loading it.
+
+    Args:
+        filepath: Path to the data file.
+        file_type: 'transactions' or 'customers'.
+        ingestor: File ingestor.
+        validator: Schema validator.
+        transformer: Transform pipeline.
+        loader: Connected database loader.
+        profiler: Stage profiler.
+        claim_lost: Set by the queue heartbeat if another worker takes
+            over the file's claim.
+
+    Returns:
+        The file's result.
+    """
+    import time
+
+    from pipeline.exceptions import ClaimLostError, is_transient
+    from pipeline.report import FileResult
+
+    started = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            if attempt > 1:
+                loader.close()
+                loader.connect()
+            with profiler.file(filepath):
+                count = process_file(
+                    filepath, file_type,
+                    ingestor, validator, transformer, loader, profiler,
+                    claim_lost,
+                )
+            break
+        except ClaimLostError as e:
+            logger.warning("Stopped processing %s: %s", filepath.name, e)
+            return FileResult(
+                file_name=filepath.name,
+                file_type=file_type,
+                status="reclaimed",
+                attempts=attempt,
+                seconds=time.perf_counter() - started,
+                error_class=type(e).__name__,
+                error=str(e),
+            )
+        except Exception as e:
+            transient = is_transient(e)
+            if transient and attempt <= config.max_retries:
+                delay = config.retry_backoff_seconds * 2 ** (attempt - 1)
+                logger.warning(
+                    "Transient failure on %s (attempt %d of %d): %s. "
+                    "Retrying in %.1fs",
+                    filepath.name,
+                    attempt,
+                    config.max_retries + 1,
+                    e,
+                    delay,
+                )
+                time.sleep(delay)
                 continue
 
-    finally:
-        loader.close()
+            logger.error(
+                "Failed to process %s (%s): %s",
+                filepath.name,
+                "transient" if transient else "permanent",
+                e,
+            )
+            return FileResult(
+                file_name=filepath.name,
+                file_type=file_type,
+                status="failed",
+                attempts=attempt,
+                seconds=time.perf_counter() - started,
+                error_class=type(e).__name__,
+                error=str(e),
+                transient=transient,
+            )
 
-    logger.info(
-        "Pipeline complete: %d rows loaded, %d errors",
-        total_loaded,
-        errors,
+    if count is None:
+        logger.warning("Skipping %s: validation failed", filepath.name)
+    return FileResult(
+        file_name=filepath.name,
+        file_type=file_type,
+        status="invalid" if count is None else "loaded",
+        rows=count or 0,
+        attempts=attempt,
+        seconds=time.perf_counter() - started,
     )
 
-    if errors > 0:
-        logger.warning("Pipeline finished with %d error(s)", errors)
-        sys.exit(1)
+
+def process_file(
+    filepath: Path,
+    file_type: str,
+    ingestor: "FileIngestor",
+    validator: "SchemaValidator",
+    transformer: "TransformPipeline",
+    loader: "DatabaseLoader",
+    profiler: "StageProfiler",
+    claim_lost: "threading.Event | None" = None,
+) -> int | None:
+    """Ingest, validate, transform and load a single file.
+
+    Args:
+        filepath: Path to the data file.
+        file_type: 'transactions' or 'customers'.
+        ingestor: File ingestor.
+        validator: Schema validator.
+        transformer: Transform pipeline.
+        loader: Connected database loader.
+        profiler: Stage profiler for the current file.
+        claim_lost: Set by the queue heartbeat if another worker takes
+            over the file's claim.
+
+    Returns:
+        Number of rows loaded, or None if the file failed validation.
+    """
+    from pipeline.exceptions import ValidationError
+    from pipeline.utils import get_file_source
+
+    if file_type == "transactions" and config.checkpoint_rows > 0:
+        return load_transactions_checkpointed(
+            filepath, ingestor, validator, transformer, loader, profiler,
+            claim_lost,
+        )
+
+    if file_type == "transactions":
+        with profiler.stage("ingest_csv"):
+            df = ingestor.ingest_csv(filepath)
+        with profiler.stage("validate"):
+            valid = validator.validate(df, "transactions")
+        if not valid:
+            return None
+        with profiler.stage("transform_transactions"):
+            transformed = transformer.transform_transactions(
+                df, get_file_source(filepath)
+            )
+        check_claim(filepath, claim_lost)
+        with profiler.stage("load_transactions"):
+            count = loader.load_transactions(transformed, filepath.name)
+    else:
+        batches = iter_customer_batches(
+            filepath, ingestor, validator, transformer, profiler, claim_lost
+        )
+        try:
+            with profiler.stage("load_customers"):
+                count = loader.load_customer_batches(batches, filepath.name)
+        except ValidationError:
+            return None
+
+    logger.info("✓ Loaded %s (%d rows)", filepath.name, count)
+    return count
+
+
+def iter_customer_batches(
+    filepath: Path,
+    ingestor: "FileIngestor",
+    validator: "SchemaValidator",
+    transformer: "TransformPipeline",
+    profiler: "StageProfiler",
+    claim_lost: "threading.Event | None" = None,
+) -> "Iterator[pd.DataFrame]":
+    """Stream validated, transformed batches from a customer file.
+
+    Args:
+        filepath: Path to the customer JSON or NDJSON file.
+        ingestor: File ingestor.
+        validator: Schema validator.
+        transformer: Transform pipeline.
+        profiler: Stage profiler for the current file.
+        claim_lost: Set by the queue heartbeat if another worker takes
+            over the file's claim.
+
+    Yields:
+        Transformed customer batches.
+
+    Raises:
+        ValidationError: If any batch fails validation, or the file has
+            no records.
+    """
+    from pipeline.exceptions import ValidationError
+    from pipeline.utils import get_file_source
+
+    source = get_file_source(filepath)
+    batches = ingestor.iter_json_batches(filepath)
+    empty = True
+    while True:
+        with profiler.stage("ingest_json"):
+            batch = next(batches, None)
+        if batch is None:
+            break
+        empty = False
+        with profiler.stage("validate"):
+            valid = validator.validate(batch, "customers")
+        if not valid:
+            raise ValidationError(f"Validation failed for {filepath.name}")
+        with profiler.stage("transform_customers"):
+            transformed = transformer.transform_customers(batch, source)
+        check_claim(filepath, claim_lost)
+        yield transformed
+
+    if empty:
+        raise ValidationError(f"No records in {filepath.name}")
+
+
+def check_claim(filepath: Path, claim_lost: "threading.Event | None") -> None:
+    """Stop processing a queued file whose claim has been lost.
+
+    Called before each write, so a file another worker has reclaimed is
+    not loaded twice.
+
+    Raises:
+        ClaimLostError: If ``claim_lost`` is set.
+    """
+    if claim_lost is not None and claim_lost.is_set():
+        from pipeline.exceptions import ClaimLostError
+
+        raise ClaimLostError(
+            f"Claim on {filepath.name} was lost to another worker",
+            file_path=str(filepath),
+        )
+
+
+def load_transactions_checkpointed(
+    filepath: Path,
+    ingestor: "FileIngestor",
+    validator: "SchemaValidator",
+    transformer: "TransformPipeline",
+    loader: "DatabaseLoader",
+    profiler: "StageProfiler",
+    claim_lost: "threading.Event | None" = None,
+) -> int | None:
+    """Load a transaction file in committed, resumable chunks.
+
+    Resumes from the file's last committed chunk, if any. Each chunk is
+    validated, transformed and committed together with its checkpoint.
+
+    Args:
+        filepath: Path to the transaction CSV.
+        ingestor: File ingestor.
+        validator: Schema validator.
+        transformer: Transform pipeline.
+        loader: Connected database loader.
+        profiler: Stage profiler for the current file.
+        claim_lost: Set by the queue heartbeat if another worker takes
+            over the file's claim.
+
+    Returns:
+        Number of rows loaded by this run, or None if a chunk failed
+        validation. Chunks before the invalid one stay committed, so the
+        file is reported as invalid rather than loaded.
+    """
+    from pipeline.utils import get_file_source
+
+    checkpoint = loader.get_checkpoint(filepath.name)
+    if checkpoint is not None and checkpoint.completed:
+        logger.info("Skipping %s: already loaded", filepath.name)
+        return 0
+
+    start_offset = 0
+    if checkpoint is not None:
+        start_offset = checkpoint.byte_offset
+        logger.info(
+            "Resuming %s at byte %d (%d rows already loaded)",
+            filepath.name,
+            start_offset,
+            checkpoint.rows_loaded,
+        )
+
+    chunks = ingestor.iter_csv_chunks(
+        filepath, config.checkpoint_rows, start_offset
+    )
+    loaded = 0
+    while True:
+        with profiler.stage("ingest_csv"):
+            chunk = next(chunks, None)
+        if chunk is None:
+            break
+
+        with profiler.stage("validate"):
+            valid = validator.validate(chunk.frame, "transactions")
+        if not valid:
+            logger.warning(
+                "Stopping %s at byte %d: validation failed. Rows before "
+                "this offset (%d loaded by this run) remain committed",
+                filepath.name,
+                chunk.start_offset,
+                loaded,
+            )
+            return None
+
+        with profiler.stage("transform_transactions"):
+            transformed = transformer.transform_transactions(
+                chunk.frame, get_file_source(filepath)
+            )
+        check_claim(filepath, claim_lost)
+        with profiler.stage("load_transactions"):
+            loaded += loader.load_transaction_chunk(
+                transformed, filepath.name, chunk.end_offset
+            )
+
+    loader.complete_checkpoint(filepath.name)
+    logger.info("✓ Loaded %s (%d rows)", filepath.name, loaded)
+    return loaded
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command-line entry point.
+
+    Args:
+        argv: Command-line arguments (defaults to ``sys.argv[1:]``).
+
+    Returns:
+        Process exit code: 0 on success, 1 if any file failed
+        permanently, and ``EXIT_TRANSIENT`` (75) if every failure was
+        transient.
+    """
+    parser = argparse.ArgumentParser(
+        prog="payments-pipeline",
+        description="Ingest landing files into the payments database.",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging verbosity (default: INFO).",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        help="Write the run report to this JSON file.",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=args.log_level,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    if not has_pending_files():
+        logger.info("No files to process in %s", config.landing_dir)
+        return 0
+
+    report = run_pipeline()
+    if args.report:
+        report.write(args.report)
+    return report.exit_code
 
 
 if __name__ == "__main__":
-    run_pipeline()
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""Parallel CSV parsing for very large transaction files.
+
+Memory-maps the file, splits it at newline boundaries into one byte
+range per worker, and parses the ranges concurrently in worker
+processes. Column dtypes are inferred once from a sample at the start
+of the file and imposed on every range, so all ranges agree on their
+types. If any range does not fit the sampled types, or the file cannot
+be split safely, the whole file is parsed serially instead. The result
+is always identical to ``pd.read_csv(filepath)``.
+
+Workers are never forked directly from the pipeline process, which may
+be running other threads (see ``_worker_context``).
+"""
+
+import io
+import logging
+import mmap
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from pipeline.config import config
+
+logger = logging.getLogger(__name__)
+
+# Bytes parsed from the start of the file to infer column dtypes
+SAMPLE_BYTES = 1 << 20
+
+
+def read_csv_parallel(filepath: Path, workers: int | None = None) -> pd.DataFrame:
+    """Parse a CSV file across several processes.
+
+    Args:
+        filepath: Path to an uncompressed CSV file.
+        workers: Number of worker processes (defaults to
+            ``config.parallel_csv_workers``).
+
+    Returns:
+        The parsed DataFrame, identical to ``pd.read_csv(filepath)``.
+    """
+    workers = workers or config.parallel_csv_workers
+    ranges, names, dtypes = _plan(filepath, workers)
+    if ranges is None:
+        logger.info("Parsing %s serially: file cannot be split", filepath.name)
+        return pd.read_csv(filepath)
+
+    logger.info(
+        "Parsing %s in %d ranges across %d processes",
+        filepath.name,
+        len(ranges),
+        workers,
+    )
+    tasks = [(str(filepath), start, end, names, dtypes) for start, end in ranges]
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=_worker_context()
+        ) as pool:
+            frames = list(pool.map(_parse_range, tasks))
+    except ValueError as e:
+        logger.info(
+            "Parsing %s serially: a range did not match sampled dtypes (%s)",
+            filepath.name,
+            e,
+        )
+        return pd.read_csv(filepath)
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def _plan(
+    filepath: Path, workers: int
+) -> tuple[list[tuple[int, int]] | None, list[str], dict]:
+    """Work out the byte ranges, column names and dtypes for a file.
+
+    Returns:
+        (ranges, names, dtypes), with ranges None if the file should be
+        parsed serially: it has no data rows, or it contains quote
+        characters, which could hide newlines inside a field.
+    """
+    with open(filepath, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        size = len(mm)
+        data_start = mm.find(b"\n") + 1
+        if data_start == 0 or data_start >= size or mm.find(b'"') != -1:
+            return None, [], {}
+
+        sample_end = mm.rfind(b"\n", 0, min(size, data_start + SAMPLE_BYTES)) + 1
+        if sample_end <= data_start:
+            sample_end = size
+        sample = pd.read_csv(io.BytesIO(mm[:sample_end]))
+
+        step = max((size - data_start) // workers, 1)
+        ranges = []
+        start = data_start
+        while start < size:
+            end = mm.find(b"\n", min(start + step, size - 1))
+            end = size if end == -1 else end + 1
+            ranges.append((start, end))
+            start = end
+
+    return ranges, list(sample.columns), sample.dtypes.to_dict()
+
+
+def _parse_range(task: tuple[str, int, int, list[str], dict]) -> pd.DataFrame:
+    """Parse one byte range of a CSV file (runs in a worker process)."""
+    path, start, end, names, dtypes = task
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        data = mm[start:end]
+    return pd.read_csv(io.BytesIO(data), header=None, names=names, dtype=dtypes)
+
+
+def _worker_context() -> multiprocessing.context.BaseContext:
+    """Return the process start method for parsing workers.
+
+    The pipeline may have other threads running, such as the queue
+    heartbeat, and forking a multi-threaded process can deadlock the
+    child. Workers are therefore started from a forkserver where it is
+    available, and spawned otherwise.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
@@ -0,0 +1,154 @@
+"""Opt-in per-stage profiling.
+
+When ``config.profile_dir`` is set, a sample of files (one in every
+``1 / config.profile_sample_rate``) is profiled. For each sampled file,
+every pipeline stage runs under cProfile, and tracemalloc records what
+the stage allocated. Files that are not sampled run with no profiling
+overhead, so a low sample rate can be left on in production.
+
+Output goes to one directory per file under ``profile_dir``:
+
+- ``<stage>.prof``: cProfile stats for the stage, accumulated over
+  every call made for the file (e.g. each checkpoint chunk). Open with
+  ``python -m pstats`` or snakeviz.
+- ``<stage>.alloc.txt``: the peak traced memory and the top allocation
+  sites of each call to the stage. For nested stages the peak covers
+  the outermost stage so far.
+"""
+
+import cProfile
+import logging
+import random
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from pipeline.config import config
+
+logger = logging.getLogger(__name__)
+
+# Allocation sites listed per stage call
+TOP_ALLOCATIONS = 25
+
+# Keep tracemalloc's own bookkeeping out of the reports
+TRACE_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+)
+
+
+class StageProfiler:
+    """Profiles pipeline stages for a sample of files.
+
+    Usage::
+
+        profiler = StageProfiler()
+        with profiler.file(filepath):
+            with profiler.stage("ingest_csv"):
+                df = ingestor.ingest_csv(filepath)
+
+    Stages may nest, e.g. customer batches are read and transformed
+    while ``load_customers`` pulls them. Time spent in the inner stage is
+    attributed to it alone.
+    """
+
+    def __init__(
+        self,
+        profile_dir: Path | None = None,
+        sample_rate: float | None = None,
+    ):
+        self.profile_dir = profile_dir or config.profile_dir
+        self.sample_rate = (
+            config.profile_sample_rate if sample_rate is None else sample_rate
+        )
+        self._output: Path | None = None
+        self._profiles: dict[str, cProfile.Profile] = {}
+        self._calls: dict[str, int] = {}
+        self._stack: list[cProfile.Profile] = []
+
+    @property
+    def enabled(self) -> bool:
+        """True if profiling is configured at all."""
+        return self.profile_dir is not None and self.sample_rate > 0
+
+    @contextmanager
+    def file(self, filepath: Path) -> Iterator[bool]:
+        """Profile the stages run for one file, if it is sampled.
+
+        Args:
+            filepath: File about to be processed.
+
+        Yields:
+            True if the file is being profiled.
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            yield False
+            return
+
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        self._output = self.profile_dir / f"{stamp}_{filepath.name}"
+        self._output.mkdir(parents=True, exist_ok=True)
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        try:
+            yield True
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            for stage, profile in self._profiles.items():
+                profile.dump_stats(self._output / f"{stage}.prof")
+            logger.info("Wrote profiles for %s to %s", filepath.name, self._output)
+            self._output = None
+            self._stack = []
+            self._profiles = {}
+            self._calls = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Profile one call to a pipeline stage.
+
+        Does nothing if the current file is not sampled. If another stage
+        is active, it is paused so its profile excludes this one. Its
+        allocation report still includes this stage's allocations.
+
+        Args:
+            name: Stage name, e.g. ``"transform_transactions"``.
+        """
+        if self._output is None:
+            yield
+            return
+
+        profile = self._profiles.setdefault(name, cProfile.Profile())
+        self._calls[name] = self._calls.get(name, 0) + 1
+        if self._stack:
+            self._stack[-1].disable()
+        else:
+            tracemalloc.reset_peak()
+        self._stack.append(profile)
+        before = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            _, peak = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(TRACE_FILTERS)
+            self._write_allocations(name, peak, after.compare_to(before, "lineno"))
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1].enable()
+
+    def _write_allocations(
+        self, name: str, peak: int, stats: list[tracemalloc.StatisticDiff]
+    ) -> None:
+        """Append the allocation report for one stage call."""
+        lines = [
+            f"# {name} call {self._calls[name]}: "
+            f"peak {peak / 2**20:.1f} MiB traced",
+        ]
+        lines.extend(str(stat) for stat in stats[:TOP_ALLOCATIONS])
+        with open(self._output / f"{name}.alloc.txt", "a") as f:
+            f.write("\n".join(lines) + "\n\n")
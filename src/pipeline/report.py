@@ -0,0 +1,93 @@
+"""Structured results of a pipeline run.
+
+``run_pipeline`` returns a ``RunReport`` with one ``FileResult`` per file
+it attempted, so schedulers can act on what happened to each file
+instead of parsing logs.
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+# Exit code when the only failures are transient (sysexits EX_TEMPFAIL),
+# telling the scheduler a retry may succeed
+EXIT_TRANSIENT = 75
+
+
+@dataclass
+class FileResult:
+    """Outcome of processing one file.
+
+    ``status`` is ``"loaded"``, ``"invalid"`` (failed validation and was
+    skipped), ``"reclaimed"`` (another queue worker took over the file,
+    so it is not a failure) or ``"failed"``.
+    """
+
+    file_name: str
+    file_type: str
+    status: str
+    rows: int = 0
+    attempts: int = 1
+    seconds: float = 0.0
+    error_class: str | None = None
+    error: str | None = None
+    transient: bool = False
+
+
+@dataclass
+class RunReport:
+    """Outcome of a pipeline run.
+
+    ``error`` is set when the run stopped before it could process every
+    file, e.g. because the database could not be reached.
+    """
+
+    started_at: datetime = field(default_factory=datetime.now)
+    finished_at: datetime | None = None
+    files: list[FileResult] = field(default_factory=list)
+    batching: dict = field(default_factory=dict)
+    error_class: str | None = None
+    error: str | None = None
+    transient: bool = False
+
+    @property
+    def rows_loaded(self) -> int:
+        """Total rows loaded across all files."""
+        return sum(result.rows for result in self.files)
+
+    @property
+    def failed(self) -> list[FileResult]:
+        """Files that failed, after any retries."""
+        return [result for result in self.files if result.status == "failed"]
+
+    @property
+    def exit_code(self) -> int:
+        """Process exit code for the run.
+
+        0 if neither the run nor any file failed, ``EXIT_TRANSIENT`` if
+        every failure was transient, and 1 if any failure was permanent.
+        """
+        transient = [result.transient for result in self.failed]
+        if self.error is not None:
+            transient.append(self.transient)
+        if not transient:
+            return 0
+        if all(transient):
+            return EXIT_TRANSIENT
+        return 1
+
+    def to_dict(self) -> dict:
+        """Return the report as JSON-serialisable data."""
+        data = asdict(self)
+        data["started_at"] = self.started_at.isoformat()
+        data["finished_at"] = (
+            self.finished_at.isoformat() if self.finished_at else None
+        )
+        data["rows_loaded"] = self.rows_loaded
+        data["exit_code"] = self.exit_code
+        return data
+
+    def write(self, path: Path) -> None:
+        """Write the report to a JSON file."""
+        path.write_text(json.dumps(self.to_dict(), indent=2) + "\n")
@@ -0,0 +1,108 @@
+"""Daily rollups computed from transaction batches before loading.
+
+``analytics.daily_summary`` reads these pre-aggregated tables instead of
+scanning ``transactions``:
+
+- ``daily_merchant_rollup``: transaction count and amount (in pence)
+  per day, merchant and status. Active merchants per day and status is
+  the number of rows, so no distinct count over transactions is needed.
+- ``daily_customer_keys``: the exact set of (day, status, customer)
+  keys, so unique customers is a count of rows. Keys merge across
+  batches by set union (``ON CONFLICT DO NOTHING``).
+
+Amounts are summed as integer pence so batch totals add up exactly.
+Pence are rounded the way ``transactions.amount`` is stored, so the
+rollups match ``SUM(amount)`` and ``rebuild_daily_rollups()``.
+Days are taken in ``config.timezone``, matching how transaction
+timestamps are stored.
+"""
+
+import logging
+from dataclasses import dataclass
+from decimal import ROUND_HALF_UP, Decimal
+
+import pandas as pd
+
+from pipeline.config import config
+
+logger = logging.getLogger(__name__)
+
+MERCHANT_ROLLUP_COLUMNS = [
+    "transaction_day", "merchant_id", "status",
+    "transaction_count", "amount_cents",
+]
+CUSTOMER_KEY_COLUMNS = ["transaction_day", "status", "customer_id"]
+
+
+@dataclass(frozen=True)
+class DailyRollups:
+    """Aggregates of one transaction batch, ready to upsert."""
+
+    merchant_totals: pd.DataFrame
+    customer_keys: pd.DataFrame
+
+
+def compute_daily_rollups(df: pd.DataFrame) -> DailyRollups:
+    """Aggregate a transformed transaction batch by day.
+
+    Rows without a date or status cannot be keyed and are left out.
+    Rows without a merchant add no merchant totals, and rows without a
+    customer add no customer key.
+
+    Args:
+        df: Transformed transaction DataFrame.
+
+    Returns:
+        The batch's merchant totals and customer keys, sorted by key so
+        that concurrent upserts lock rows in the same order.
+    """
+    keyed = df.assign(
+        transaction_day=_local_day(df["transaction_date"]),
+        amount_cents=_to_pence(df["amount"]),
+    ).dropna(subset=["transaction_day", "status"])
+
+    merchant_totals = (
+        keyed.dropna(subset=["merchant_id"])
+        .groupby(["transaction_day", "merchant_id", "status"], sort=True)
+        .agg(
+            transaction_count=("transaction_id", "size"),
+            amount_cents=("amount_cents", "sum"),
+        )
+        .reset_index()[MERCHANT_ROLLUP_COLUMNS]
+    )
+    customer_keys = (
+        keyed.dropna(subset=["customer_id"])[CUSTOMER_KEY_COLUMNS]
+        .drop_duplicates()
+        .sort_values(CUSTOMER_KEY_COLUMNS, ignore_index=True)
+    )
+
+    logger.debug(
+        "Rolled %d transactions into %d merchant totals and %d customer keys",
+        len(df),
+        len(merchant_totals),
+        len(customer_keys),
+    )
+    return DailyRollups(merchant_totals, customer_keys)
+
+
+def _to_pence(amounts: pd.Series) -> pd.Series:
+    """Convert amounts to integer pence as Postgres stores them.
+
+    psycopg2 sends a float as its shortest decimal representation, and
+    the ``NUMERIC(10,2)`` column rounds that decimal half away from
+    zero. Rounding ``amount * 100`` as a float instead would give 100
+    pence for 1.005, which is stored as 1.01.
+    """
+    return amounts.map(
+        lambda amount: int(
+            Decimal(str(float(amount))).quantize(Decimal("0.01"), ROUND_HALF_UP)
+            * 100
+        )
+    ).astype("int64")
+
+
+def _local_day(dates: pd.Series) -> pd.Series:
+    """Return the calendar day of each timestamp in ``config.timezone``."""
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert(config.timezone)
+    return dates.dt.date
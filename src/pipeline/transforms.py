@@ -5,14 +5,23 @@ into the database. Handles type conversions, standardisation, and
 derived fields.
 """
 
+import hashlib
 import logging
 
 import pandas as pd
 
 from pipeline.config import config
+from pipeline.dates import DateParser
 
 logger = logging.getLogger(__name__)
 
+# Customer attributes whose changes are tracked by row_hash. The order,
+# separator and NULL marker must match customer_row_hash() in
+# sql/migrations/005_customer_history.sql.
+CUSTOMER_HASH_COLUMNS = ["merchant_id", "email", "first_name", "last_name", "country"]
+HASH_FIELD_SEPARATOR = "\x1f"
+HASH_NULL_MARKER = "\\N"
+
 
 class TransformPipeline:
     """Applies sequential transformations to DataFrames.
@@ -23,8 +32,11 @@ class TransformPipeline:
 
     def __init__(self):
         self.timezone = config.timezone
+        self.date_parser = DateParser(self.timezone)
 
-    def transform_transactions(self, df: pd.DataFrame) -> pd.DataFrame:
+    def transform_transactions(
+        self, df: pd.DataFrame, source: str | None = None
+    ) -> pd.DataFrame:
         """Transform raw transaction data for database loading.
 
         Applies:
@@ -34,6 +46,7 @@ class TransformPipeline:
 
         Args:
             df: Raw transaction DataFrame.
+            source: Feed the data came from, used to cache date formats.
 
         Returns:
             Transformed DataFrame ready for loading.
@@ -42,7 +55,9 @@ class TransformPipeline:
         result = df.copy()
 
         # Parse transaction dates
-        result["transaction_date"] = pd.to_datetime(result["transaction_date"])
+        result["transaction_date"] = self.date_parser.parse(
+            result["transaction_date"], source, tuple(df.columns)
+        )
 
         # Ensure amount is numeric
         result["amount"] = pd.to_numeric(result["amount"], errors="coerce")
@@ -64,16 +79,20 @@ class TransformPipeline:
         logger.info("Transformation complete: %d rows", len(result))
         return result
 
-    def transform_customers(self, df: pd.DataFrame) -> pd.DataFrame:
+    def transform_customers(
+        self, df: pd.DataFrame, source: str | None = None
+    ) -> pd.DataFrame:
         """Transform raw customer data for database loading.
 
         Applies:
         - Date parsing
         - String normalisation
         - Email validation
+        - Row hash over the tracked attributes
 
         Args:
             df: Raw customer DataFrame.
+            source: Feed the data came from, used to cache date formats.
 
         Returns:
             Transformed DataFrame ready for loading.
@@ -82,7 +101,9 @@ class TransformPipeline:
         result = df.copy()
 
         # Parse dates
-        result["created_at"] = pd.to_datetime(result["created_at"])
+        result["created_at"] = self.date_parser.parse(
+            result["created_at"], source, tuple(df.columns)
+        )
 
         # Normalise string fields
         for col in ["first_name", "last_name", "email"]:
@@ -93,5 +114,40 @@ class TransformPipeline:
         if "country" in result.columns:
             result["country"] = result["country"].str.upper().str.strip()
 
+        # Fingerprint tracked attributes for change detection
+        result["row_hash"] = customer_row_hash(result)
+
         logger.info("Transformation complete: %d rows", len(result))
         return result
+
+
+def customer_row_hash(df: pd.DataFrame) -> pd.Series:
+    """Hash the tracked attributes of each customer row.
+
+    The attributes are joined with a unit separator, with NULLs written
+    as ``\\N``, and the first 8 bytes of the MD5 of the UTF-8 text are
+    read as a signed big-endian int64 to fit a Postgres BIGINT. The same
+    digest can be computed in SQL, so stored rows can be backfilled, and
+    it does not depend on the pandas version. Missing columns hash as
+    NULL, which is what the loader stores for them.
+
+    Args:
+        df: Transformed customer DataFrame.
+
+    Returns:
+        Series of int64 hashes aligned with ``df``.
+    """
+    values = df.reindex(columns=CUSTOMER_HASH_COLUMNS).astype(object)
+    hashes = [
+        int.from_bytes(
+            hashlib.md5(
+                HASH_FIELD_SEPARATOR.join(
+                    HASH_NULL_MARKER if pd.isna(v) else str(v) for v in row
+                ).encode("utf-8")
+            ).digest()[:8],
+            "big",
+            signed=True,
+        )
+        for row in values.itertuples(index=False, name=None)
+    ]
+    return pd.Series(hashes, index=df.index, dtype="int64")
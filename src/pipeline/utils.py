@@ -7,25 +7,71 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
+from pipeline.config import config
+
 logger = logging.getLogger(__name__)
 
 
+def strip_compression_suffix(filepath: Path) -> Path:
+    """Drop a compression suffix, e.g. 'x.csv.gz' -> 'x.csv'.
+
+    Args:
+        filepath: Path to the data file.
+
+    Returns:
+        The path without its compression suffix, if it had one.
+    """
+    if filepath.suffix.lower() in config.compression_suffixes:
+        return filepath.with_suffix("")
+    return filepath
+
+
+def with_compression_suffixes(pattern: str) -> list[str]:
+    """Expand a glob pattern to also match compressed variants.
+
+    Args:
+        pattern: Glob pattern for the uncompressed file (e.g., '*.csv').
+
+    Returns:
+        The pattern followed by one pattern per compression suffix.
+    """
+    return [pattern] + [pattern + suffix for suffix in config.compression_suffixes]
+
+
 def get_file_date(filepath: Path) -> str | None:
     """Extract date string from a filename like 'transactions_20240115.csv'.
 
+    Compressed names such as 'transactions_20240115.csv.gz' are handled too.
+
     Args:
         filepath: Path to the data file.
 
     Returns:
         Date string (e.g., '20240115') or None if pattern doesn't match.
     """
-    stem = filepath.stem  # e.g., 'transactions_20240115'
+    stem = strip_compression_suffix(filepath).stem  # e.g., 'transactions_20240115'
     parts = stem.rsplit("_", 1)
     if len(parts) == 2 and parts[1].isdigit() and len(parts[1]) == 8:
         return parts[1]
     return None
 
 
+def get_file_source(filepath: Path) -> str:
+    """Extract the feed name from a filename like 'transactions_20240115.csv'.
+
+    Args:
+        filepath: Path to the data file.
+
+    Returns:
+        Feed name (e.g., 'transactions'), or the full stem if the filename
+        carries no date suffix.
+    """
+    stem = strip_compression_suffix(filepath).stem
+    if get_file_date(filepath) is not None:
+        return stem.rsplit("_", 1)[0]
+    return stem
+
+
 def format_date(date_str: str, input_format: str = "%Y%m%d") -> str:
     """Convert a date string to ISO format.
 
@@ -0,0 +1,341 @@
+"""Postgres-backed work queue for multi-node ingestion.
+
+Lets several pipeline workers share one landing volume. Discovered files
+are enqueued once into ``file_queue``; workers claim them one at a time
+with ``SELECT ... FOR UPDATE SKIP LOCKED``, heartbeat while processing,
+and mark them done or failed, or return them to the queue after a
+transient failure. Claims whose heartbeat goes stale are released for
+another worker to pick up.
+"""
+
+import logging
+import os
+import socket
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import psycopg2
+
+from pipeline.config import config
+from pipeline.exceptions import LoadError
+
+logger = logging.getLogger(__name__)
+
+
+class WorkQueue:
+    """Coordinates file processing across workers through Postgres.
+
+    Files are identified by name relative to the landing directory, so
+    nodes may mount the shared volume at different paths.
+    """
+
+    def __init__(
+        self,
+        database_url: str | None = None,
+        worker_id: str | None = None,
+    ):
+        self.database_url = database_url or config.database_url
+        self.worker_id = (
+            worker_id
+            or config.worker_id
+            or f"{socket.gethostname()}-{os.getpid()}"
+        )
+        self._conn = None
+        # Files this worker returned to the queue during the run
+        self._returned: set[str] = set()
+
+    def connect(self):
+        """Establish database connection."""
+        try:
+            self._conn = psycopg2.connect(self.database_url)
+            self._conn.autocommit = True
+            logger.info("Work queue connected as %s", self.worker_id)
+        except psycopg2.Error as e:
+            raise LoadError(f"Failed to connect to database: {e}") from e
+
+    def close(self):
+        """Close database connection."""
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    def enqueue(self, files: dict[str, list[Path]]) -> int:
+        """Add discovered files to the queue, ignoring ones already known.
+
+        Args:
+            files: Mapping of file type to file paths, as returned by
+                ``FileIngestor.discover_files``.
+
+        Returns:
+            Number of files newly enqueued.
+        """
+        rows = [
+            (path.name, file_type)
+            for file_type, paths in files.items()
+            for path in paths
+        ]
+        if not rows:
+            return 0
+
+        added = 0
+        with self._cursor() as cur:
+            for file_name, file_type in rows:
+                cur.execute(
+                    """
+                    INSERT INTO file_queue (file_name, file_type)
+                    VALUES (%s, %s)
+                    ON CONFLICT (file_name) DO NOTHING
+                    """,
+                    (file_name, file_type),
+                )
+                added += cur.rowcount
+
+        logger.info("Enqueued %d new file(s)", added)
+        return added
+
+    def claim(self) -> tuple[str, str] | None:
+        """Claim the oldest pending file.
+
+        Rows locked by other workers' claims are skipped, so concurrent
+        workers never receive the same file. Files this worker returned
+        with ``retry_later`` are left for a later run or another worker.
+
+        Returns:
+            (file name, file type) of the claimed file, or None if the
+            queue has no pending work.
+        """
+        with self._cursor() as cur:
+            cur.execute(
+                """
+                UPDATE file_queue
+                SET status       = 'claimed',
+                    claimed_by   = %s,
+                    claimed_at   = NOW(),
+                    heartbeat_at = NOW(),
+                    attempts     = attempts + 1
+                WHERE id = (
+                    SELECT id
+                    FROM file_queue
+                    WHERE status = 'pending'
+                      AND file_name <> ALL(%s)
+                    ORDER BY id
+                    FOR UPDATE SKIP LOCKED
+                    LIMIT 1
+                )
+                RETURNING file_name, file_type
+                """,
+                (self.worker_id, sorted(self._returned)),
+            )
+            row = cur.fetchone()
+
+        if row:
+            logger.info("Claimed %s", row[0])
+        return row
+
+    def iter_claims(self, landing_dir: Path) -> Iterator[tuple[Path, str]]:
+        """Claim files one at a time until the queue is drained.
+
+        Args:
+            landing_dir: Local mount point of the shared landing volume.
+
+        Yields:
+            (file path, file type) for each claimed file.
+        """
+        while (claim := self.claim()) is not None:
+            file_name, file_type = claim
+            yield landing_dir / file_name, file_type
+
+    def complete(self, filepath: Path) -> None:
+        """Mark a claimed file as successfully processed."""
+        self._finish(filepath, "done", None)
+
+    def fail(self, filepath: Path, error: str) -> None:
+        """Mark a claimed file as failed so it is not claimed again."""
+        self._finish(filepath, "failed", error)
+
+    def retry_later(self, filepath: Path, error: str) -> None:
+        """Return a claimed file to the queue after a transient failure.
+
+        Files that have used ``config.max_claim_attempts`` claims are
+        marked failed instead, so an outage cannot keep a file in the
+        queue forever.
+        """
+        self._returned.add(filepath.name)
+        with self._cursor() as cur:
+            cur.execute(
+                """
+                UPDATE file_queue
+                SET status      = CASE WHEN attempts >= %s
+                                       THEN 'failed' ELSE 'pending' END,
+                    claimed_by  = NULL,
+                    last_error  = %s,
+                    finished_at = CASE WHEN attempts >= %s THEN NOW() END
+                WHERE file_name = %s
+                  AND claimed_by = %s
+                """,
+                (
+                    config.max_claim_attempts,
+                    error,
+                    config.max_claim_attempts,
+                    filepath.name,
+                    self.worker_id,
+                ),
+            )
+            if cur.rowcount == 0:
+                logger.warning(
+                    "Claim on %s was lost before it finished", filepath.name
+                )
+
+    def heartbeat(self, filepath: Path) -> bool:
+        """Refresh the heartbeat on a claimed file.
+
+        Returns:
+            False if this worker no longer holds the claim.
+        """
+        with self._cursor() as cur:
+            return self._touch(cur, filepath.name)
+
+    def release_stale(self, timeout_seconds: int | None = None) -> int:
+        """Return claims with stale heartbeats to the queue.
+
+        Claims that have already used ``config.max_claim_attempts`` are
+        marked failed instead, so a file that crashes workers is not
+        retried forever.
+
+        Args:
+            timeout_seconds: Heartbeat age after which a claim is stale.
+
+        Returns:
+            Number of claims released or failed.
+        """
+        timeout = timeout_seconds or config.claim_timeout_seconds
+        with self._cursor() as cur:
+            cur.execute(
+                """
+                UPDATE file_queue
+                SET status     = CASE WHEN attempts >= %s
+                                      THEN 'failed' ELSE 'pending' END,
+                    claimed_by = NULL,
+                    last_error = 'claim expired'
+                WHERE status = 'claimed'
+                  AND heartbeat_at < NOW() - %s * INTERVAL '1 second'
+                """,
+                (config.max_claim_attempts, timeout),
+            )
+            released = cur.rowcount
+
+        if released:
+            logger.warning("Released %d stale claim(s)", released)
+        return released
+
+    @contextmanager
+    def keep_alive(
+        self, filepath: Path, interval_seconds: int | None = None
+    ) -> Iterator[threading.Event]:
+        """Heartbeat a claim from a background thread while in the block.
+
+        The thread uses its own connection, so heartbeats continue while
+        the worker's main connection is busy loading. Failed heartbeats
+        are retried on a new connection at the next interval. If another
+        worker has taken over the claim, the yielded event is set and
+        heartbeats stop. The caller should then stop processing the file
+        (see ``ClaimLostError``).
+
+        Args:
+            filepath: The claimed file.
+            interval_seconds: Seconds between heartbeats.
+
+        Yields:
+            Event that is set when this worker loses the claim.
+        """
+        interval = interval_seconds or config.heartbeat_seconds
+        stop = threading.Event()
+        lost = threading.Event()
+
+        def beat():
+            conn = None
+            try:
+                while not stop.wait(interval):
+                    try:
+                        if conn is None:
+                            conn = psycopg2.connect(self.database_url)
+                            conn.autocommit = True
+                        with conn.cursor() as cur:
+                            held = self._touch(cur, filepath.name)
+                    except psycopg2.Error as e:
+                        logger.warning(
+                            "Heartbeat for %s failed, retrying: %s",
+                            filepath.name,
+                            e,
+                        )
+                        if conn is not None:
+                            conn.close()
+                            conn = None
+                        continue
+
+                    if not held:
+                        logger.error("Lost claim on %s", filepath.name)
+                        lost.set()
+                        return
+            finally:
+                if conn is not None:
+                    conn.close()
+
+        thread = threading.Thread(
+            target=beat, name=f"heartbeat-{filepath.name}", daemon=True
+        )
+        thread.start()
+        try:
+            yield lost
+        finally:
+            stop.set()
+            thread.join()
+
+    def _touch(self, cur, file_name: str) -> bool:
+        """Update the heartbeat for a claim held by this worker."""
+        cur.execute(
+            """
+            UPDATE file_queue
+            SET heartbeat_at = NOW()
+            WHERE file_name = %s
+              AND status = 'claimed'
+              AND claimed_by = %s
+            """,
+            (file_name, self.worker_id),
+        )
+        return cur.rowcount == 1
+
+    def _finish(self, filepath: Path, status: str, error: str | None) -> None:
+        """Record the outcome of a claim held by this worker."""
+        with self._cursor() as cur:
+            cur.execute(
+                """
+                UPDATE file_queue
+                SET status      = %s,
+                    last_error  = %s,
+                    finished_at = NOW()
+                WHERE file_name = %s
+                  AND claimed_by = %s
+                """,
+                (status, error, filepath.name, self.worker_id),
+            )
+            if cur.rowcount == 0:
+                logger.warning(
+                    "Claim on %s was lost before it finished", filepath.name
+                )
+
+    @contextmanager
+    def _cursor(self):
+        """Yield a cursor, translating database errors to LoadError."""
+        if self._conn is None:
+            raise LoadError("Not connected to database")
+        try:
+            with self._conn.cursor() as cur:
+                yield cur
+        except psycopg2.Error as e:
+            raise LoadError(
+                f"Work queue operation failed: {e}",
+                table="file_queue",
+            ) from e
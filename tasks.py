@@ -7,6 +7,9 @@ Usage: uv run tasks.py <command>
 import subprocess
 import sys
 import os
+from pathlib import Path
+
+MIGRATIONS_DIR = Path(__file__).parent / "sql" / "migrations"
 
 
 def run(cmd, check=True, shell=True):
@@ -19,6 +22,7 @@ def run(cmd, check=True, shell=True):
 def setup():
     """Start database and install Python dependencies."""
     run("docker compose up -d --wait")
+    migrate()
     run("uv sync")
     print("\n✓ Database ready on localhost:5433")
     print("✓ Python dependencies installed")
@@ -40,6 +44,15 @@ def verify():
     print("✓ Environment is ready.")
 
 
+def migrate():
+    """Apply schema migrations in sql/migrations/."""
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        run(
+            "docker compose exec -T db psql -U pipeline -d payments"
+            f" -v ON_ERROR_STOP=1 -f /migrations/{path.name}"
+        )
+
+
 def run_pipeline():
     """Run the ingestion pipeline against landing/ files."""
     run("uv run python -m pipeline.main")
@@ -56,6 +69,17 @@ def run_analytics():
     print("✓ Analytics views refreshed. Query them with 'uv run tasks.py query-report'.")
 
 
+def bench_analytics():
+    """Compare analytics query plans against the committed baseline."""
+    if not run("uv run python scripts/query_plans.py", check=False):
+        sys.exit(1)
+
+
+def bench_baseline():
+    """Re-measure analytics query plans and update the baseline."""
+    run("uv run python scripts/query_plans.py --update-baseline")
+
+
 def query_report():
     """Display the weekly merchant report."""
     run(
@@ -86,15 +110,19 @@ def reset():
     if os.path.exists(log):
         os.remove(log)
     run("docker compose up -d --wait")
+    migrate()
     print("✓ Database reset to initial state.")
 
 
 COMMANDS = {
     "setup": setup,
     "verify": verify,
+    "migrate": migrate,
     "run-pipeline": run_pipeline,
     "run-analytics": run_analytics,
     "query-report": query_report,
+    "bench-analytics": bench_analytics,
+    "bench-baseline": bench_baseline,
     "psql": psql,
     "test": test,
     "teardown": teardown,
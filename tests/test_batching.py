@@ -0,0 +1,65 @@
+"""Tests for adaptive insert batch sizing."""
+
+import pytest
+
+from pipeline.batching import BatchSizer
+
+
+@pytest.fixture
+def sizer():
+    return BatchSizer(
+        initial_size=500,
+        min_size=100,
+        max_size=10_000,
+        target_seconds=0.5,
+        max_bytes=1_000_000,
+    )
+
+
+class TestBatchSizer:
+    """Tests for BatchSizer."""
+
+    def test_grows_when_fast(self, sizer):
+        """Fast batches should grow the size, at most doubling per batch."""
+        assert sizer.record(500, 0.05, 50_000) == 1000
+
+    def test_shrinks_when_slow(self, sizer):
+        """Slow batches should shrink the size, at most halving per batch."""
+        assert sizer.record(500, 5.0, 50_000) == 250
+
+    def test_converges_on_target(self, sizer):
+        """A batch near the target latency should scale proportionally."""
+        assert sizer.record(500, 0.4, 50_000) == 625
+
+    def test_byte_ceiling_caps_size(self, sizer):
+        """Wide rows should cap the size under the byte ceiling."""
+        assert sizer.record(500, 0.01, 500_000) == 1000
+        assert sizer.record(1000, 0.01, 1_000_000) == 1000
+
+    def test_respects_bounds(self, sizer):
+        """Sizes should stay within the configured min and max."""
+        for _ in range(10):
+            sizer.record(sizer.size, 0.001, 10)
+        assert sizer.size == 10_000
+        for _ in range(20):
+            sizer.record(sizer.size, 100.0, 10)
+        assert sizer.size == 100
+
+    def test_short_final_batch_keeps_size(self, sizer):
+        """A short batch at the target per-row cost should not shrink the size."""
+        sizer.record(500, 0.5, 50_000)
+        assert sizer.record(50, 0.05, 5_000) == 500
+
+    def test_summary(self, sizer):
+        """The summary should report chosen sizes for run metrics."""
+        sizer.record(500, 0.05, 50_000)
+        sizer.record(1000, 0.5, 100_000)
+        summary = sizer.summary()
+        assert summary["batches"] == 2
+        assert summary["rows"] == 1500
+        assert summary["max_size"] == 1000
+        assert summary["next_size"] == 1000
+
+    def test_byte_ceiling_overrides_min_size(self, sizer):
+        """Very wide rows should drop below min_size to honour the byte cap."""
+        assert sizer.record(100, 0.01, 5_000_000) == 20
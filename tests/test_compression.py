@@ -0,0 +1,175 @@
+"""Tests for transparent decompression of landing files."""
+
+import bz2
+import gzip
+import struct
+import zlib
+
+import pandas as pd
+import pytest
+
+from pipeline import compression
+from pipeline.compression import open_compressed
+from pipeline.exceptions import IngestionError
+from pipeline.ingestion import FileIngestor
+
+PAYLOAD = b"".join(
+    f"txn_{i:05d},m_{i % 20:03d},{i * 1.25:.2f}\n".encode() for i in range(5000)
+)
+
+
+def bgzf_block(data: bytes) -> bytes:
+    """Build one BGZF member: a gzip member with a 'BC' block-size field."""
+    deflate = zlib.compressobj(6, zlib.DEFLATED, -15)
+    body = deflate.compress(data) + deflate.flush()
+    extra = b"BC" + struct.pack("<HH", 2, 0)
+    header = (
+        b"\x1f\x8b\x08\x04" + b"\x00" * 4 + b"\x00\xff"
+        + struct.pack("<H", len(extra))
+    )
+    trailer = struct.pack("<II", zlib.crc32(data), len(data))
+    block = header + extra + body + trailer
+    return block[:16] + struct.pack("<H", len(block) - 1) + block[18:]
+
+
+def chunks(data: bytes, size: int) -> list[bytes]:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+class TestOpenCompressed:
+    """Tests for open_compressed."""
+
+    def test_plain(self, tmp_path):
+        path = tmp_path / "data.csv"
+        path.write_bytes(PAYLOAD)
+        with open_compressed(path) as f:
+            assert f.read() == PAYLOAD
+
+    def test_gzip(self, tmp_path):
+        path = tmp_path / "data.csv.gz"
+        path.write_bytes(gzip.compress(PAYLOAD))
+        with open_compressed(path) as f:
+            assert f.read() == PAYLOAD
+
+    def test_bz2(self, tmp_path):
+        path = tmp_path / "data.csv.bz2"
+        path.write_bytes(bz2.compress(PAYLOAD))
+        with open_compressed(path) as f:
+            assert f.read() == PAYLOAD
+
+    def test_bgzf_parallel(self, tmp_path, mocker):
+        """BGZF members should be decompressed in parallel, in order."""
+        path = tmp_path / "data.csv.gz"
+        path.write_bytes(
+            b"".join(bgzf_block(c) for c in chunks(PAYLOAD, 4096)) + bgzf_block(b"")
+        )
+        spy = mocker.spy(compression, "_inflate_gzip_member")
+        with open_compressed(path) as f:
+            assert f.read() == PAYLOAD
+        assert spy.call_count == len(chunks(PAYLOAD, 4096)) + 1
+
+    def test_zstd_stream(self, tmp_path):
+        zstandard = pytest.importorskip("zstandard")
+        path = tmp_path / "data.json.zst"
+        path.write_bytes(zstandard.ZstdCompressor().compress(PAYLOAD))
+        with open_compressed(path) as f:
+            assert f.read() == PAYLOAD
+
+    def test_zstd_seekable_parallel(self, tmp_path):
+        """Seekable zstd files should be split using their seek table."""
+        zstandard = pytest.importorskip("zstandard")
+        cctx = zstandard.ZstdCompressor()
+        frames = [cctx.compress(c) for c in chunks(PAYLOAD, 4096)]
+        table = b"".join(
+            struct.pack("<II", len(frame), len(c))
+            for frame, c in zip(frames, chunks(PAYLOAD, 4096))
+        )
+        footer = struct.pack("<IBI", len(frames), 0, compression.ZSTD_SEEKABLE_MAGIC)
+        skippable = struct.pack(
+            "<II", compression.ZSTD_SKIPPABLE_SEEK_TABLE, len(table) + len(footer)
+        )
+        path = tmp_path / "data.csv.zst"
+        path.write_bytes(b"".join(frames) + skippable + table + footer)
+
+        assert len(compression._zstd_seekable_frames(path)) == len(frames)
+        with open_compressed(path) as f:
+            assert f.read() == PAYLOAD
+
+
+class TestCompressedIngestion:
+    """Tests for compressed files flowing through FileIngestor."""
+
+    def test_discovers_compressed(self, tmp_path):
+        (tmp_path / "transactions_20240115.csv.gz").write_bytes(b"")
+        (tmp_path / "transactions_20240116.csv").write_bytes(b"")
+        (tmp_path / "customers_20240115.json.bz2").write_bytes(b"")
+        files = FileIngestor(landing_dir=tmp_path).discover_files()
+        assert [p.name for p in files["transactions"]] == [
+            "transactions_20240115.csv.gz", "transactions_20240116.csv",
+        ]
+        assert [p.name for p in files["customers"]] == ["customers_20240115.json.bz2"]
+
+    def test_csv_matches_plain(self, tmp_path, sample_transactions_df):
+        plain = tmp_path / "transactions_20240115.csv"
+        sample_transactions_df.to_csv(plain, index=False)
+        packed = tmp_path / "transactions_20240116.csv.gz"
+        packed.write_bytes(gzip.compress(plain.read_bytes()))
+
+        ingestor = FileIngestor(landing_dir=tmp_path)
+        pd.testing.assert_frame_equal(
+            ingestor.ingest_csv(packed), ingestor.ingest_csv(plain)
+        )
+
+    def test_csv_chunks_resume(self, tmp_path, sample_transactions_df):
+        """Chunk offsets should index the decompressed stream."""
+        path = tmp_path / "transactions_20240115.csv.gz"
+        csv = sample_transactions_df.to_csv(index=False).encode()
+        path.write_bytes(gzip.compress(csv))
+        ingestor = FileIngestor(landing_dir=tmp_path)
+        first = next(ingestor.iter_csv_chunks(path, 2))
+        resumed = list(ingestor.iter_csv_chunks(path, 10, first.end_offset))
+        assert list(resumed[0].frame["transaction_id"]) == [
+            "txn_003", "txn_004", "txn_005",
+        ]
+
+    def test_csv_chunks_resume_zstd(self, tmp_path, sample_transactions_df):
+        """Streamed zstd files should support chunked reads across frames."""
+        zstandard = pytest.importorskip("zstandard")
+        csv = sample_transactions_df.to_csv(index=False).encode()
+        half = len(csv) // 2
+        cctx = zstandard.ZstdCompressor()
+        path = tmp_path / "transactions_20240115.csv.zst"
+        path.write_bytes(cctx.compress(csv[:half]) + cctx.compress(csv[half:]))
+        ingestor = FileIngestor(landing_dir=tmp_path)
+        chunks = list(ingestor.iter_csv_chunks(path, 2))
+        assert [len(c.frame) for c in chunks] == [2, 2, 1]
+        resumed = list(ingestor.iter_csv_chunks(path, 10, chunks[0].end_offset))
+        assert list(resumed[0].frame["transaction_id"]) == [
+            "txn_003", "txn_004", "txn_005",
+        ]
+
+    def test_json(self, tmp_path, sample_customers_df):
+        path = tmp_path / "customers_20240115.json.gz"
+        records = sample_customers_df.to_json(orient="records").encode()
+        path.write_bytes(gzip.compress(records))
+        df = FileIngestor(landing_dir=tmp_path).ingest_json(path)
+        assert list(df["customer_id"]) == ["c_001", "c_002", "c_003"]
+
+    @pytest.mark.parametrize("suffix", [".gz", ".bz2"])
+    def test_truncated_csv_wrapped(self, tmp_path, sample_transactions_df, suffix):
+        """Truncated archives should raise IngestionError, not EOFError."""
+        csv = sample_transactions_df.to_csv(index=False).encode()
+        packed = gzip.compress(csv) if suffix == ".gz" else bz2.compress(csv)
+        path = tmp_path / f"transactions_20240115.csv{suffix}"
+        path.write_bytes(packed[: len(packed) // 2])
+        with pytest.raises(IngestionError):
+            list(FileIngestor(landing_dir=tmp_path).iter_csv_chunks(path, 2))
+
+    def test_corrupt_bgzf_json_wrapped(self, tmp_path):
+        """A corrupt BGZF member should raise IngestionError, not zlib.error."""
+        block = bytearray(bgzf_block(b'[{"a": 1}, {"a": 2}]'))
+        block[20:24] = b"\xff\xff\xff\xff"
+        path = tmp_path / "customers_20240115.json.gz"
+        path.write_bytes(bytes(block) + bgzf_block(b""))
+        with pytest.raises(IngestionError, match="Failed to read JSON"):
+            FileIngestor(landing_dir=tmp_path).ingest_json(path)
@@ -0,0 +1,61 @@
+"""Tests for the date parsing module."""
+
+import pandas as pd
+import pytest
+
+from pipeline.dates import DateParser
+
+
+@pytest.fixture
+def parser():
+    return DateParser("UTC")
+
+
+class TestDateParser:
+    """Tests for DateParser."""
+
+    def test_format_detected_and_cached(self, parser):
+        """The detected format should be cached per source and schema."""
+        series = pd.Series(["2024-01-15 23:52:48", "2024-01-16 00:02:29"], name="d")
+        parser.parse(series, "transactions", ("d",))
+        assert parser._formats[("transactions", ("d",), "d")] == "%Y-%m-%d %H:%M:%S"
+
+    def test_values_parsed(self, parser):
+        """Parsed values should match pandas inference."""
+        series = pd.Series(["2024-01-15T10:23:00", "2024-01-15T14:05:30"], name="d")
+        result = parser.parse(series, "transactions", ("d",))
+        expected = pd.to_datetime(series).dt.tz_localize("UTC")
+        pd.testing.assert_series_equal(result, expected)
+
+    def test_timezone_applied(self):
+        """Naive timestamps should be localised to the configured timezone."""
+        series = pd.Series(["2024-07-01 12:00:00"], name="d")
+        result = DateParser("Europe/London").parse(series)
+        assert str(result.dt.tz) == "Europe/London"
+        assert result.iloc[0].utcoffset() == pd.Timedelta(hours=1)
+
+    def test_dst_transitions(self):
+        """Times in a DST gap or overlap should localise instead of raising."""
+        series = pd.Series(
+            ["2024-03-31 01:30:00", "2024-10-27 01:30:00"], name="d"
+        )
+        result = DateParser("Europe/London").parse(series)
+        assert list(result) == [
+            pd.Timestamp("2024-03-31 01:00:00", tz="UTC"),
+            pd.Timestamp("2024-10-27 01:30:00", tz="UTC"),
+        ]
+
+    def test_offsets_converted(self, parser):
+        """Timestamps with an offset should be converted to the timezone."""
+        series = pd.Series(["2024-01-15T10:00:00+02:00"], name="d")
+        result = parser.parse(series)
+        assert result.iloc[0] == pd.Timestamp("2024-01-15 08:00:00", tz="UTC")
+
+    def test_format_change_reinferred(self, parser):
+        """A source that changes format should fall back to inference."""
+        parser.parse(pd.Series(["2024-01-15"], name="d"), "customers", ("d",))
+        result = parser.parse(
+            pd.Series(["15 Jan 2024 10:00"], name="d"), "customers", ("d",)
+        )
+        assert result.iloc[0] == pd.Timestamp("2024-01-15 10:00:00", tz="UTC")
+        assert ("customers", ("d",), "d") not in parser._formats
@@ -0,0 +1,69 @@
+"""Tests for the pipeline error taxonomy."""
+
+import psycopg2
+import psycopg2.errors
+
+from pipeline.exceptions import LoadError, ValidationError, is_transient
+from pipeline.report import EXIT_TRANSIENT, FileResult, RunReport
+
+
+class ServerError(psycopg2.OperationalError):
+    """An OperationalError carrying a server SQLSTATE."""
+
+    pgcode = "53100"  # disk_full
+
+
+class LockTimeout(psycopg2.OperationalError):
+    pgcode = "55P03"
+
+
+def wrapped(error: Exception) -> LoadError:
+    """Wrap an error the way the loader does."""
+    try:
+        raise LoadError("Failed to load transactions", table="transactions") from error
+    except LoadError as e:
+        return e
+
+
+class TestIsTransient:
+    """Tests for transient/permanent classification."""
+
+    def test_connection_errors_transient(self):
+        assert is_transient(psycopg2.OperationalError("server closed the connection"))
+        assert is_transient(psycopg2.InterfaceError("connection already closed"))
+
+    def test_wrapped_errors_classified_by_cause(self):
+        assert is_transient(wrapped(LockTimeout()))
+        assert not is_transient(wrapped(psycopg2.errors.UndefinedColumn()))
+
+    def test_sqlstate_decides_server_errors(self):
+        """A server error outside the transient codes should be permanent."""
+        assert not is_transient(ServerError())
+
+    def test_pipeline_errors_permanent(self):
+        assert not is_transient(ValidationError("bad schema"))
+        assert not is_transient(ValueError("bad data"))
+
+
+class TestRunReport:
+    """Tests for the run report's exit codes."""
+
+    def result(self, status: str, transient: bool = False) -> FileResult:
+        return FileResult("f.csv", "transactions", status, transient=transient)
+
+    def test_success(self):
+        report = RunReport(files=[self.result("loaded"), self.result("invalid")])
+        assert report.exit_code == 0
+
+    def test_only_transient_failures(self):
+        report = RunReport(files=[
+            self.result("loaded"), self.result("failed", transient=True),
+        ])
+        assert report.exit_code == EXIT_TRANSIENT
+
+    def test_permanent_failure(self):
+        report = RunReport(files=[
+            self.result("failed", transient=True), self.result("failed"),
+        ])
+        assert report.exit_code == 1
+        assert report.to_dict()["exit_code"] == 1
@@ -0,0 +1,185 @@
+"""Tests for the file ingestion module."""
+
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from pipeline.exceptions import IngestionError
+from pipeline.ingestion import FileIngestor, _iter_json_records
+from pipeline.parallel_csv import read_csv_parallel
+
+
+@pytest.fixture
+def ingestor(tmp_path):
+    return FileIngestor(landing_dir=tmp_path)
+
+
+@pytest.fixture
+def transactions_csv(tmp_path, sample_transactions_df):
+    path = tmp_path / "transactions_20240115.csv"
+    sample_transactions_df.to_csv(path, index=False)
+    return path
+
+
+class TestIterCsvChunks:
+    """Tests for chunked CSV reading."""
+
+    def test_chunks_match_full_read(self, ingestor, transactions_csv):
+        """Concatenated chunks should equal a full read of the file."""
+        chunks = list(ingestor.iter_csv_chunks(transactions_csv, 2))
+        assert [len(c.frame) for c in chunks] == [2, 2, 1]
+        combined = pd.concat([c.frame for c in chunks], ignore_index=True)
+        pd.testing.assert_frame_equal(combined, pd.read_csv(transactions_csv))
+
+    def test_offsets_contiguous(self, ingestor, transactions_csv):
+        """Each chunk should start where the previous one ended."""
+        chunks = list(ingestor.iter_csv_chunks(transactions_csv, 2))
+        for prev, nxt in zip(chunks, chunks[1:]):
+            assert nxt.start_offset == prev.end_offset
+        assert chunks[-1].end_offset == transactions_csv.stat().st_size
+
+    def test_resume_skips_committed_rows(self, ingestor, transactions_csv):
+        """Resuming from a chunk's end offset should yield only later rows."""
+        first = next(ingestor.iter_csv_chunks(transactions_csv, 2))
+        resumed = list(
+            ingestor.iter_csv_chunks(transactions_csv, 10, first.end_offset)
+        )
+        assert len(resumed) == 1
+        assert list(resumed[0].frame["transaction_id"]) == [
+            "txn_003", "txn_004", "txn_005",
+        ]
+
+
+@pytest.fixture
+def customer_records(sample_customers_df):
+    return sample_customers_df.to_dict(orient="records")
+
+
+class TestJsonIngestion:
+    """Tests for streaming JSON and NDJSON ingestion."""
+
+    def test_array_matches_json_load(self, ingestor, tmp_path, customer_records):
+        """A JSON array should parse to the same frame as before."""
+        path = tmp_path / "customers_20240115.json"
+        path.write_text(json.dumps(customer_records, indent=2))
+        pd.testing.assert_frame_equal(
+            ingestor.ingest_json(path), pd.DataFrame(customer_records)
+        )
+
+    def test_ndjson_matches_array(self, ingestor, tmp_path, customer_records):
+        """Newline-delimited JSON should parse like the equivalent array."""
+        path = tmp_path / "customers_20240115.json"
+        path.write_text("\n".join(json.dumps(r) for r in customer_records) + "\n")
+        pd.testing.assert_frame_equal(
+            ingestor.ingest_json(path), pd.DataFrame(customer_records)
+        )
+
+    def test_batches(self, ingestor, tmp_path, customer_records):
+        """Records should be yielded in fixed-size batches."""
+        path = tmp_path / "customers_20240115.json"
+        path.write_text(json.dumps(customer_records))
+        batches = list(ingestor.iter_json_batches(path, batch_size=2))
+        assert [len(b) for b in batches] == [2, 1]
+        assert list(batches[1]["customer_id"]) == ["c_003"]
+
+    def test_small_read_blocks(self, ingestor, tmp_path, customer_records, monkeypatch):
+        """Records split across read blocks should decode correctly."""
+        monkeypatch.setattr("pipeline.ingestion.JSON_READ_SIZE", 7)
+        path = tmp_path / "customers_20240115.json"
+        path.write_text(json.dumps(customer_records, indent=2))
+        assert len(ingestor.ingest_json(path)) == len(customer_records)
+
+    def test_missing_keys_filled(self, ingestor, tmp_path):
+        """Keys missing from some records should become empty values."""
+        path = tmp_path / "customers_20240115.json"
+        path.write_text('{"a": 1}\n{"a": 2, "b": "x"}\n')
+        df = ingestor.ingest_json(path)
+        assert list(df.columns) == ["a", "b"]
+        assert df["b"].isna().tolist() == [True, False]
+
+    def test_invalid_json_raises(self, ingestor, tmp_path):
+        """Malformed JSON should raise IngestionError."""
+        path = tmp_path / "customers_20240115.json"
+        path.write_text('[{"a": 1} {"a": 2}]')
+        with pytest.raises(IngestionError, match="Invalid JSON"):
+            ingestor.ingest_json(path)
+
+    def test_malformed_record_fails_fast(self, tmp_path, monkeypatch):
+        """A bad record mid-buffer should raise without reading further."""
+        monkeypatch.setattr("pipeline.ingestion.JSON_READ_SIZE", 256)
+        body = '{"a": 1}\n{"a": 2,, "b": 3}\n' + '{"a": 3}\n' * 10_000
+
+        class CountingReader(io.StringIO):
+            reads = 0
+
+            def read(self, size=-1):
+                CountingReader.reads += 1
+                return super().read(size)
+
+        records = _iter_json_records(CountingReader(body), tmp_path / "x.json")
+        assert next(records) == {"a": 1}
+        with pytest.raises(json.JSONDecodeError):
+            next(records)
+        assert CountingReader.reads == 1
+
+    @pytest.mark.parametrize("size", [3, 5, 11])
+    def test_tokens_split_across_blocks(self, tmp_path, monkeypatch, size):
+        """Literals, numbers and escapes cut by a block boundary should decode."""
+        monkeypatch.setattr("pipeline.ingestion.JSON_READ_SIZE", size)
+        records = [
+            {"a": True, "b": None, "c": -12.5e3, "d": "caf\u00e9"},
+            {"a": False, "b": "x" * 40, "c": 0, "d": ""},
+        ]
+        body = "\n".join(json.dumps(r) for r in records)
+        path = tmp_path / "x.json"
+        assert list(_iter_json_records(io.StringIO(body), path)) == records
+
+    def test_non_object_records_raise(self, ingestor, tmp_path):
+        """Arrays of non-objects should raise IngestionError."""
+        path = tmp_path / "customers_20240115.json"
+        path.write_text("[1, 2, 3]")
+        with pytest.raises(IngestionError, match="Expected JSON object"):
+            ingestor.ingest_json(path)
+
+
+class TestParallelCsv:
+    """Tests for the multi-process CSV reader."""
+
+    @pytest.fixture
+    def large_csv(self, tmp_path):
+        path = tmp_path / "transactions_20240115.csv"
+        rows = [
+            "transaction_id,merchant_id,customer_id,amount,"
+            "transaction_date,status,payment_method"
+        ]
+        for i in range(2000):
+            rows.append(
+                f"txn_{i},m_{i % 20:03d},c_{i % 300:03d},{i * 0.37:.2f},"
+                f"2024-01-15 10:{i % 60:02d}:00,completed,card"
+            )
+        path.write_text("\n".join(rows) + "\n")
+        return path
+
+    def test_matches_read_csv(self, large_csv, monkeypatch):
+        """Parallel output should be identical to pd.read_csv."""
+        monkeypatch.setattr("pipeline.parallel_csv.SAMPLE_BYTES", 1024)
+        result = read_csv_parallel(large_csv, workers=4)
+        pd.testing.assert_frame_equal(result, pd.read_csv(large_csv))
+
+    def test_dtype_mismatch_falls_back(self, large_csv, monkeypatch):
+        """Ranges that contradict the sampled dtypes should fall back."""
+        monkeypatch.setattr("pipeline.parallel_csv.SAMPLE_BYTES", 1024)
+        with large_csv.open("a") as f:
+            f.write("txn_x,m_001,c_001,,2024-01-15 10:00:00,completed,card\n")
+            f.write("txn_y,m_001,c_001,abc,2024-01-15 10:00:00,completed,card\n")
+        result = read_csv_parallel(large_csv, workers=4)
+        pd.testing.assert_frame_equal(result, pd.read_csv(large_csv))
+
+    def test_quoted_file_parsed_serially(self, tmp_path):
+        """Files with quotes should not be split."""
+        path = tmp_path / "transactions_20240115.csv"
+        path.write_text('a,b\n1,"x\ny"\n2,z\n')
+        result = read_csv_parallel(path, workers=2)
+        pd.testing.assert_frame_equal(result, pd.read_csv(path))
@@ -0,0 +1,199 @@
+"""Tests for the database loader, against mocked cursors."""
+
+import pytest
+from psycopg2 import sql
+
+from pipeline.batching import BatchSizer
+from pipeline.config import PipelineConfig
+from pipeline.loader import TRANSACTION_COLUMNS, DatabaseLoader, KeyRange
+
+
+@pytest.fixture
+def loader():
+    loader = DatabaseLoader(database_url="postgresql://test")
+    loader.batch_sizer = BatchSizer(initial_size=2, min_size=1, max_size=2)
+    return loader
+
+
+class TestInsertRows:
+    """Tests for batched inserts."""
+
+    def test_batches_follow_sizer(
+        self, loader, mocker, sample_transactions_df
+    ):
+        """Rows should be sent in sizer-sized batches of plain tuples."""
+        execute_values = mocker.patch("pipeline.loader.execute_values")
+        cur = mocker.Mock(query=b"x" * 100)
+        loader._insert_rows(
+            cur, "transactions", TRANSACTION_COLUMNS, sample_transactions_df
+        )
+        batches = [c.args[2] for c in execute_values.call_args_list]
+        assert [len(b) for b in batches] == [2, 2, 1]
+        assert batches[0][0][0] == "txn_001"
+        assert len(batches[0][0]) == len(TRANSACTION_COLUMNS)
+
+    def test_key_ranges_come_from_returning(
+        self, loader, mocker, sample_transactions_df
+    ):
+        """With a key, each statement should report its written key range."""
+        execute_values = mocker.patch(
+            "pipeline.loader.execute_values",
+            side_effect=[
+                [(2, "txn_001", "txn_002")],
+                [(1, "txn_003", "txn_003")],
+                [(0, None, None)],
+            ],
+        )
+        cur = mocker.Mock(query=b"x" * 100)
+        written = loader._insert_rows(
+            cur,
+            "transactions",
+            TRANSACTION_COLUMNS,
+            sample_transactions_df,
+            key="transaction_id",
+        )
+        statement = execute_values.call_args.args[1]
+        assert "RETURNING transaction_id AS key" in statement
+        assert "MIN(key), MAX(key)" in statement
+        assert execute_values.call_args.kwargs["fetch"] is True
+        assert written == [
+            KeyRange(2, "txn_001", "txn_002"),
+            KeyRange(1, "txn_003", "txn_003"),
+            KeyRange(0, None, None),
+        ]
+
+
+class TestPublishChange:
+    """Tests for change_log entries."""
+
+    @pytest.fixture(autouse=True)
+    def change_log_enabled(self, monkeypatch):
+        monkeypatch.setattr(
+            "pipeline.loader.config", PipelineConfig(change_log_enabled=True)
+        )
+
+    def test_sends_only_bounds(self, loader, mocker):
+        """Only per-statement bounds should be sent, not every key."""
+        cur = mocker.Mock()
+        written = [
+            KeyRange(2, "txn_001", "txn_002"),
+            KeyRange(0, None, None),
+            KeyRange(1, "txn_003", "txn_003"),
+        ]
+        loader._publish_change(cur, "transactions", "a.csv", written)
+        params = cur.execute.call_args.args[1]
+        assert params == (
+            "transactions",
+            "a.csv",
+            3,
+            ["txn_001", "txn_002", "txn_003", "txn_003"],
+        )
+
+    def test_skips_when_nothing_written(self, loader, mocker):
+        """No entry should be written when every row was skipped."""
+        cur = mocker.Mock()
+        loader._publish_change(cur, "customers", "c.csv", [KeyRange(0, None, None)])
+        cur.execute.assert_not_called()
+
+
+def statement_text(statement) -> str:
+    """Render a statement passed to a mocked cursor as plain text."""
+    if isinstance(statement, sql.Composable):
+        return "".join(
+            part.string if isinstance(part, sql.SQL) else ".".join(part.strings)
+            for part in getattr(statement, "seq", [statement])
+        )
+    return statement
+
+
+class TestBulkMode:
+    """Tests for choosing and running bulk mode."""
+
+    @pytest.mark.parametrize(
+        ("threshold", "reltuples", "rows", "expected"),
+        [
+            (0, 0, 1_000_000, False),
+            (100_000, 0, 50_000, False),
+            (100_000, -1, 200_000, True),
+            (100_000, 300_000, 200_000, True),
+            (100_000, 50_000_000, 200_000, False),
+        ],
+    )
+    def test_use_bulk_mode(
+        self, loader, mocker, monkeypatch, threshold, reltuples, rows, expected
+    ):
+        """Bulk mode should need the threshold and a share of the table."""
+        monkeypatch.setattr(
+            "pipeline.loader.config",
+            PipelineConfig(
+                bulk_load_threshold=threshold, bulk_load_min_fraction=0.5
+            ),
+        )
+        cur = mocker.Mock()
+        cur.fetchone.return_value = (reltuples,)
+        assert loader._use_bulk_mode(cur, "transactions", rows) is expected
+
+    def test_deferred_maintenance_sequence(self, loader, mocker):
+        """Indexes and FKs should be dropped, then recreated from the catalog."""
+        cur = mocker.Mock()
+        cur.fetchall.side_effect = [
+            [("idx_a", "CREATE INDEX idx_a ON public.transactions (a)")],
+            [("fk_m", "FOREIGN KEY (merchant_id) REFERENCES merchants(merchant_id)")],
+        ]
+        with loader._deferred_maintenance(cur, "transactions"):
+            cur.execute("INSERT")
+
+        statements = [statement_text(c.args[0]) for c in cur.execute.call_args_list]
+        catalog_index, catalog_fk = statements[:2]
+        assert "NOT i.indisprimary" in catalog_index
+        assert "NOT i.indisunique" in catalog_index
+        assert "contype = 'f'" in catalog_fk
+        assert cur.execute.call_args_list[0].args[1] == ("transactions",)
+        assert statements[2:] == [
+            "DROP INDEX idx_a",
+            "ALTER TABLE transactions DROP CONSTRAINT fk_m",
+            "INSERT",
+            "SET LOCAL maintenance_work_mem = %s",
+            "CREATE INDEX idx_a ON public.transactions (a)",
+            "ALTER TABLE transactions ADD CONSTRAINT fk_m "
+            "FOREIGN KEY (merchant_id) REFERENCES merchants(merchant_id)",
+            "ANALYZE transactions",
+        ]
+
+    def test_failure_skips_rebuild(self, loader, mocker):
+        """A failed insert should leave the rollback to restore the schema."""
+        cur = mocker.Mock()
+        cur.fetchall.side_effect = [[("idx_a", "CREATE INDEX idx_a")], []]
+        with pytest.raises(RuntimeError):
+            with loader._deferred_maintenance(cur, "transactions"):
+                raise RuntimeError("insert failed")
+        statements = [statement_text(c.args[0]) for c in cur.execute.call_args_list]
+        assert "CREATE INDEX idx_a" not in statements
+
+
+class TestMergeCustomers:
+    """Tests for merging customer batches."""
+
+    def test_history_follows_returned_ids(
+        self, loader, mocker, sample_customers_df
+    ):
+        """History should only cover customers the upsert actually wrote."""
+        df = sample_customers_df.assign(row_hash=[1, 2, 3])
+        execute_values = mocker.patch(
+            "pipeline.loader.execute_values",
+            side_effect=[
+                [(1, "c_001", "c_001", ["c_001"])],
+                [(0, None, None, None)],
+            ],
+        )
+        record = mocker.patch.object(loader, "_record_customer_history")
+        cur = mocker.Mock(query=b"x" * 100)
+        cur.fetchall.return_value = [("c_003", 3)]
+
+        written = loader._merge_customers(cur, df, keep_history=True)
+
+        sent = [row[0] for c in execute_values.call_args_list for row in c.args[2]]
+        assert sent == ["c_001", "c_002"]
+        assert "array_agg(key)" in execute_values.call_args.args[1]
+        record.assert_called_once_with(cur, ["c_001"])
+        assert sum(w.rows for w in written) == 1
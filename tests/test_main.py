@@ -0,0 +1,269 @@
+"""Tests for the pipeline entry point."""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import psycopg2
+import pytest
+
+import pipeline
+from pipeline.config import PipelineConfig
+from pipeline.exceptions import IngestionError, LoadError
+from pipeline.report import EXIT_TRANSIENT
+
+SRC_DIR = Path(pipeline.__file__).resolve().parents[1]
+
+# Cumulative import budget for pipeline.main, in microseconds. Importing
+# pandas alone costs several times this.
+IMPORT_BUDGET_US = 150_000
+
+HEAVY_MODULES = ["pandas", "numpy", "psycopg2"]
+
+
+def run_python(code: str, **env) -> subprocess.CompletedProcess:
+    """Run a snippet in a fresh interpreter with the package on the path."""
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(SRC_DIR), **env},
+        check=True,
+    )
+
+
+def cumulative_import_us(stderr: str, module: str) -> int:
+    """Read the cumulative import time of a module from -X importtime output."""
+    for line in stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise AssertionError(f"{module} not found in import timings")
+
+
+class TestStartup:
+    """Import-time benchmarks guarding the lazy CLI startup."""
+
+    def test_heavy_modules_not_imported(self):
+        """Importing the entry point should not pull in pandas or psycopg2."""
+        result = run_python(
+            "import sys, pipeline.main; "
+            f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+        )
+        assert result.stdout.strip() == "[]"
+
+    def test_import_within_budget(self):
+        """Importing the entry point should stay within the time budget."""
+        result = run_python("import pipeline.main")
+        assert cumulative_import_us(result.stderr, "pipeline.main") < IMPORT_BUDGET_US
+
+    def test_empty_landing_skips_heavy_imports(self, tmp_path):
+        """A run with nothing to process should exit without heavy imports."""
+        result = run_python(
+            "import sys, pipeline.main; "
+            "code = pipeline.main.main([]); "
+            f"print(code, [m for m in {HEAVY_MODULES!r} if m in sys.modules])",
+            LANDING_DIR=str(tmp_path),
+        )
+        assert result.stdout.strip() == "0 []"
+
+
+class TestHasPendingFiles:
+    """Tests for the pre-import work check."""
+
+    def test_detects_files(self, tmp_path, monkeypatch):
+        """Files matching a known pattern should count as pending work."""
+        from pipeline import main
+
+        (tmp_path / "transactions_20240115.csv").write_text("")
+        monkeypatch.setattr(main, "config", PipelineConfig(landing_dir=tmp_path))
+        assert main.has_pending_files() is True
+
+    def test_empty_directory(self, tmp_path, monkeypatch):
+        """An empty landing directory should report no work."""
+        from pipeline import main
+
+        monkeypatch.setattr(main, "config", PipelineConfig(landing_dir=tmp_path))
+        assert main.has_pending_files() is False
+
+
+class TestProcessWithRetries:
+    """Tests for per-file retries of transient failures."""
+
+    @pytest.fixture
+    def run(self, tmp_path, monkeypatch, mocker):
+        from pipeline import main
+        from pipeline.profiling import StageProfiler
+
+        monkeypatch.setattr(
+            main,
+            "config",
+            PipelineConfig(max_retries=2, retry_backoff_seconds=0.5),
+        )
+        sleep = mocker.patch("time.sleep")
+        loader = mocker.Mock()
+        process = mocker.patch.object(main, "process_file")
+
+        def run(*outcomes):
+            process.side_effect = outcomes
+            result = main.process_with_retries(
+                tmp_path / "transactions_20240115.csv", "transactions",
+                None, None, None, loader, StageProfiler(profile_dir=None),
+            )
+            return result, sleep, loader
+
+        return run
+
+    def test_transient_failure_retried(self, run):
+        """A dropped connection should be retried on a fresh connection."""
+        result, sleep, loader = run(
+            psycopg2.OperationalError("lost"),
+            42,
+        )
+        assert (result.status, result.rows, result.attempts) == ("loaded", 42, 2)
+        sleep.assert_called_once_with(0.5)
+        loader.connect.assert_called_once()
+
+    def test_backoff_gives_up(self, run):
+        """Transient failures should stop after max_retries with backoff."""
+        error = psycopg2.OperationalError("lost")
+        result, sleep, _ = run(error, error, error)
+        assert result.status == "failed" and result.transient
+        assert result.attempts == 3
+        assert [c.args[0] for c in sleep.call_args_list] == [0.5, 1.0]
+
+    def test_permanent_failure_not_retried(self, run):
+        """Data errors should fail immediately with their error class."""
+        result, sleep, _ = run(IngestionError("bad file"))
+        assert (result.status, result.error_class) == ("failed", "IngestionError")
+        assert not result.transient
+        sleep.assert_not_called()
+
+    def test_validation_failure(self, run):
+        """Files that fail validation should be reported as invalid."""
+        result, _, _ = run(None)
+        assert (result.status, result.rows) == ("invalid", 0)
+
+
+class TestRunPipeline:
+    """Tests for run-level failure handling."""
+
+    @pytest.fixture
+    def main(self, tmp_path, monkeypatch, mocker):
+        from pipeline import main
+
+        monkeypatch.setattr(
+            main,
+            "config",
+            PipelineConfig(
+                landing_dir=tmp_path, max_retries=1, retry_backoff_seconds=0.5
+            ),
+        )
+        mocker.patch("time.sleep")
+        mocker.patch(
+            "pipeline.ingestion.FileIngestor.discover_files",
+            return_value={"transactions": [], "customers": []},
+        )
+        return main
+
+    def test_connect_outage_reported(self, main, mocker):
+        """A database outage at startup should give a transient report."""
+
+        def refuse(_):
+            raise LoadError("Failed to connect") from psycopg2.OperationalError(
+                "refused"
+            )
+
+        connect = mocker.patch(
+            "pipeline.loader.DatabaseLoader.connect",
+            autospec=True,
+            side_effect=refuse,
+        )
+        report = main.run_pipeline()
+        assert connect.call_count == 2
+        assert (report.error_class, report.transient) == ("LoadError", True)
+        assert report.exit_code == EXIT_TRANSIENT
+
+    def test_queue_transient_failure_returned(self, main, monkeypatch, mocker):
+        """In queue mode a transient failure should go back to the queue."""
+        from pipeline.report import FileResult
+
+        monkeypatch.setattr(
+            main, "config", PipelineConfig(landing_dir=Path("."), queue_mode=True)
+        )
+        mocker.patch("pipeline.loader.DatabaseLoader.connect")
+        queue = mocker.patch("pipeline.work_queue.WorkQueue").return_value
+        path = Path("transactions_20240115.csv")
+        queue.iter_claims.return_value = [(path, "transactions")]
+        mocker.patch.object(
+            main,
+            "process_with_retries",
+            return_value=FileResult(
+                file_name=path.name,
+                file_type="transactions",
+                status="failed",
+                error="connection lost",
+                transient=True,
+            ),
+        )
+        report = main.run_pipeline()
+        queue.retry_later.assert_called_once_with(path, "connection lost")
+        queue.fail.assert_not_called()
+        assert report.exit_code == EXIT_TRANSIENT
+
+
+    def test_reclaimed_file_not_failed(self, main, monkeypatch, mocker):
+        """A claim taken over by another worker should not fail the run."""
+        import threading
+
+        from pipeline.exceptions import ClaimLostError
+
+        monkeypatch.setattr(
+            main, "config", PipelineConfig(landing_dir=Path("."), queue_mode=True)
+        )
+        mocker.patch("pipeline.loader.DatabaseLoader.connect")
+        queue = mocker.patch("pipeline.work_queue.WorkQueue").return_value
+        path = Path("transactions_20240115.csv")
+        queue.iter_claims.return_value = [(path, "transactions")]
+        lost = threading.Event()
+        lost.set()
+        queue.keep_alive.return_value.__enter__.return_value = lost
+
+        def process(filepath, *args):
+            main.check_claim(filepath, args[-1])
+
+        mocker.patch.object(main, "process_file", side_effect=process)
+        report = main.run_pipeline()
+        assert [r.status for r in report.files] == ["reclaimed"]
+        assert report.files[0].error_class == ClaimLostError.__name__
+        queue.fail.assert_not_called()
+        queue.retry_later.assert_not_called()
+        assert report.exit_code == 0
+
+
+class TestLoadTransactionsCheckpointed:
+    """Tests for chunked, resumable transaction loads."""
+
+    def test_invalid_chunk_reported(self, tmp_path, monkeypatch, mocker):
+        """A chunk failing validation should mark the file invalid."""
+        from pipeline import main
+        from pipeline.ingestion import FileIngestor
+        from pipeline.profiling import StageProfiler
+
+        monkeypatch.setattr(main, "config", PipelineConfig(checkpoint_rows=2))
+        path = tmp_path / "transactions_20240115.csv"
+        path.write_text("transaction_id,amount\ntxn_1,1\ntxn_2,2\ntxn_3,3\n")
+        validator = mocker.Mock()
+        validator.validate.side_effect = [True, False]
+        loader = mocker.Mock()
+        loader.get_checkpoint.return_value = None
+        loader.load_transaction_chunk.return_value = 2
+
+        result = main.load_transactions_checkpointed(
+            path, FileIngestor(landing_dir=tmp_path), validator,
+            mocker.Mock(), loader, StageProfiler(profile_dir=None),
+        )
+        assert result is None
+        loader.load_transaction_chunk.assert_called_once()
+        loader.complete_checkpoint.assert_not_called()
@@ -0,0 +1,53 @@
+"""Tests for per-stage profiling."""
+
+import pstats
+from pathlib import Path
+
+from pipeline.profiling import StageProfiler
+
+
+def busy(n: int) -> list[int]:
+    return [i * i for i in range(n)]
+
+
+class TestStageProfiler:
+    """Tests for StageProfiler."""
+
+    def test_writes_stage_outputs(self, tmp_path):
+        """Each stage of a sampled file should get a profile and a report."""
+        profiler = StageProfiler(profile_dir=tmp_path, sample_rate=1.0)
+        with profiler.file(Path("transactions_20240115.csv")) as sampled:
+            for _ in range(2):
+                with profiler.stage("transform_transactions"):
+                    busy(1000)
+        assert sampled
+
+        (output,) = tmp_path.iterdir()
+        assert output.name.endswith("_transactions_20240115.csv")
+        stats = pstats.Stats(str(output / "transform_transactions.prof"))
+        assert any(func[2] == "busy" for func in stats.stats)
+        report = (output / "transform_transactions.alloc.txt").read_text()
+        assert "call 1" in report and "call 2" in report
+
+    def test_nested_stage_attribution(self, tmp_path):
+        """Time in a nested stage should not be counted in the outer one."""
+        profiler = StageProfiler(profile_dir=tmp_path, sample_rate=1.0)
+        with profiler.file(Path("customers_20240115.json")):
+            with profiler.stage("load_customers"):
+                with profiler.stage("transform_customers"):
+                    busy(1000)
+
+        (output,) = tmp_path.iterdir()
+        outer = pstats.Stats(str(output / "load_customers.prof"))
+        inner = pstats.Stats(str(output / "transform_customers.prof"))
+        assert not any(func[2] == "busy" for func in outer.stats)
+        assert any(func[2] == "busy" for func in inner.stats)
+
+    def test_unsampled_file_not_profiled(self, tmp_path):
+        """Files outside the sample should produce no output."""
+        profiler = StageProfiler(profile_dir=tmp_path, sample_rate=0.0)
+        with profiler.file(Path("transactions_20240115.csv")) as sampled:
+            with profiler.stage("ingest_csv"):
+                busy(10)
+        assert not sampled
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,106 @@
+"""Tests for the pure helpers of the query-plan harness."""
+
+import argparse
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "query_plans.py"
+
+
+@pytest.fixture(scope="module")
+def query_plans():
+    spec = importlib.util.spec_from_file_location("query_plans", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def args():
+    return argparse.Namespace(time_tolerance=0.25, buffer_tolerance=0.10)
+
+
+def stats(execution_ms: float, buffers: int) -> dict:
+    return {"execution_ms": execution_ms, "shared_hit": buffers, "shared_read": 0}
+
+
+class TestViewBodies:
+    """Tests for extracting view queries."""
+
+    def test_every_view_parsed(self, query_plans):
+        """Each analytics file should yield a bare SELECT or WITH query."""
+        views = query_plans.load_views()
+        assert set(views) == {
+            "daily_summary", "merchant_performance", "weekly_merchant_report",
+        }
+        for body in views.values():
+            assert body.lstrip().upper().startswith(("SELECT", "WITH"))
+            assert not body.rstrip().endswith(";")
+
+    def test_view_body_regex(self, query_plans):
+        text = "-- note\nCREATE OR REPLACE VIEW analytics.v AS\nSELECT 1;\n"
+        assert query_plans.VIEW_BODY.search(text).group(1) == "SELECT 1"
+
+    def test_generate_calls_public_functions(self, query_plans):
+        """Generation runs with only the scratch schema on the search_path."""
+        assert "SELECT public.rebuild_daily_rollups();" in query_plans.GENERATE_SQL
+
+
+class TestScanNodes:
+    """Tests for collecting scan nodes from a plan."""
+
+    def test_nested_scans(self, query_plans):
+        plan = {
+            "Node Type": "Hash Join",
+            "Plans": [
+                {"Node Type": "Seq Scan", "Relation Name": "merchants"},
+                {
+                    "Node Type": "Hash",
+                    "Plans": [{
+                        "Node Type": "Index Only Scan",
+                        "Relation Name": "transactions",
+                    }],
+                },
+            ],
+        }
+        assert query_plans.scan_nodes(plan) == [
+            "Seq Scan on merchants", "Index Only Scan on transactions",
+        ]
+
+
+class TestCompare:
+    """Tests for regression detection."""
+
+    def test_within_tolerance(self, query_plans, args):
+        results = {"v": {"1000": stats(120.0, 105)}}
+        baseline = {"v": {"1000": stats(100.0, 100)}}
+        assert query_plans.compare(results, baseline, args) == []
+
+    def test_slower_and_more_buffers(self, query_plans, args):
+        results = {"v": {"1000": stats(200.0, 200)}}
+        baseline = {"v": {"1000": stats(100.0, 100)}}
+        regressions = query_plans.compare(results, baseline, args)
+        assert len(regressions) == 2
+        assert "execution" in regressions[0] and "buffers" in regressions[1]
+
+    def test_noise_floor(self, query_plans, args):
+        """Small absolute slowdowns should not count as regressions."""
+        results = {"v": {"1000": stats(3.0, 10)}}
+        baseline = {"v": {"1000": stats(1.0, 10)}}
+        assert query_plans.compare(results, baseline, args) == []
+
+    def test_missing_baseline_entries_skipped(self, query_plans, args):
+        results = {"v": {"1000": stats(500.0, 500)}, "w": {"10": stats(1.0, 1)}}
+        baseline = {"v": {"10": stats(1.0, 1)}}
+        assert query_plans.compare(results, baseline, args) == []
+
+    def test_missing_from_baseline(self, query_plans):
+        """Views and scales without a baseline entry should be listed."""
+        results = {"v": {"10": stats(1.0, 1), "1000": stats(1.0, 1)}}
+        assert query_plans.missing_from_baseline(results, {}) == [
+            "v @ 10", "v @ 1000",
+        ]
+        baseline = {"v": {"10": stats(1.0, 1)}}
+        assert query_plans.missing_from_baseline(results, baseline) == ["v @ 1000"]
@@ -0,0 +1,62 @@
+"""Tests for daily rollup aggregation."""
+
+from datetime import date
+
+import pytest
+
+from pipeline.config import PipelineConfig
+from pipeline.rollups import compute_daily_rollups
+from pipeline.transforms import TransformPipeline
+
+
+@pytest.fixture
+def transactions(sample_transactions_df):
+    df = sample_transactions_df.copy()
+    df.loc[4, "transaction_date"] = "2024-01-16T08:00:00"
+    df.loc[2, ["merchant_id", "customer_id", "status"]] = [
+        "m_002", "c_002", "completed",
+    ]
+    return TransformPipeline().transform_transactions(df)
+
+
+class TestComputeDailyRollups:
+    """Tests for compute_daily_rollups."""
+
+    def test_merchant_totals(self, transactions):
+        """Totals should be summed per day, merchant and status in pence."""
+        totals = compute_daily_rollups(transactions).merchant_totals
+        assert list(totals.itertuples(index=False, name=None)) == [
+            (date(2024, 1, 15), "m_001", "completed", 1, 4999),
+            (date(2024, 1, 15), "m_002", "completed", 2, 17550),
+            (date(2024, 1, 15), "m_003", "completed", 1, 39999),
+            (date(2024, 1, 16), "m_002", "failed", 1, 1200),
+        ]
+
+    def test_amounts_rounded_like_numeric_column(self, transactions):
+        """Pence should round half away from zero, as NUMERIC(10,2) does."""
+        transactions = transactions.head(2).assign(
+            merchant_id="m_001", amount=[1.005, 0.125]
+        )
+        totals = compute_daily_rollups(transactions).merchant_totals
+        assert totals["amount_cents"].tolist() == [101 + 13]
+
+    def test_customer_keys_distinct(self, transactions):
+        """Repeat customers on the same day and status should give one key."""
+        keys = compute_daily_rollups(transactions).customer_keys
+        assert list(keys.itertuples(index=False, name=None)) == [
+            (date(2024, 1, 15), "completed", "c_001"),
+            (date(2024, 1, 15), "completed", "c_002"),
+            (date(2024, 1, 15), "completed", "c_004"),
+            (date(2024, 1, 16), "failed", "c_005"),
+        ]
+
+    def test_day_in_configured_timezone(self, transactions, monkeypatch):
+        """Days should be taken in the pipeline timezone."""
+        monkeypatch.setattr(
+            "pipeline.rollups.config", PipelineConfig(timezone="Asia/Tokyo")
+        )
+        totals = compute_daily_rollups(transactions).merchant_totals
+        # 16:45 UTC on the 15th is 01:45 on the 16th in Tokyo
+        assert (date(2024, 1, 16), "m_003", "completed", 1, 39999) in list(
+            totals.itertuples(index=False, name=None)
+        )
@@ -3,7 +3,7 @@
 import pandas as pd
 import pytest
 
-from pipeline.transforms import TransformPipeline
+from pipeline.transforms import TransformPipeline, customer_row_hash
 
 
 @pytest.fixture
@@ -75,3 +75,34 @@ class TestTransformCustomers:
         })
         result = transformer.transform_customers(df)
         assert result["country"].iloc[0] == "GB"
+
+    def test_row_hash_stable(self, transformer, sample_customers_df):
+        """Equal attributes should hash equally, regardless of formatting."""
+        first = transformer.transform_customers(sample_customers_df)
+        resent = sample_customers_df.copy()
+        resent["country"] = resent["country"].str.lower()
+        resent["created_at"] = "2024-02-01"
+        second = transformer.transform_customers(resent)
+        assert first["row_hash"].dtype == "int64"
+        assert first["row_hash"].tolist() == second["row_hash"].tolist()
+
+    def test_row_hash_tracks_changes(self, transformer, sample_customers_df):
+        """Changing a tracked attribute should change only that row's hash."""
+        first = transformer.transform_customers(sample_customers_df)
+        changed = sample_customers_df.copy()
+        changed.loc[1, "email"] = "bob@example.org"
+        second = transformer.transform_customers(changed)
+        assert (first["row_hash"] != second["row_hash"]).tolist() == [
+            False, True, False,
+        ]
+
+    def test_row_hash_matches_sql_digest(self):
+        """The hash should match customer_row_hash() in migration 005."""
+        df = pd.DataFrame({
+            "merchant_id": ["m_001"],
+            "email": ["alice@example.com"],
+            "first_name": ["Alice"],
+            "last_name": [None],
+            "country": ["GB"],
+        })
+        assert customer_row_hash(df).tolist() == [0xF3CEE4161F911A53 - 2**64]
@@ -0,0 +1,129 @@
+"""Tests for the Postgres-backed work queue."""
+
+import threading
+from pathlib import Path
+
+import psycopg2
+import pytest
+
+from pipeline.config import PipelineConfig
+from pipeline.exceptions import ClaimLostError, LoadError
+from pipeline.main import check_claim
+from pipeline.work_queue import WorkQueue
+
+
+@pytest.fixture
+def queue(mocker):
+    queue = WorkQueue(database_url="postgresql://test", worker_id="worker-1")
+    queue._conn = mocker.MagicMock()
+    return queue
+
+
+@pytest.fixture
+def cursor(queue):
+    return queue._conn.cursor.return_value.__enter__.return_value
+
+
+class TestWorkQueue:
+    """Tests for queue operations against a mocked cursor."""
+
+    def test_enqueue_counts_new_files(self, queue, cursor):
+        """Only rows actually inserted should count as enqueued."""
+        type(cursor).rowcount = property(
+            lambda _, counts=iter([1, 0, 1]): next(counts)
+        )
+        added = queue.enqueue({
+            "transactions": [Path("transactions_20240115.csv")],
+            "customers": [
+                Path("customers_20240115.json"), Path("customers_20240116.json"),
+            ],
+        })
+        assert added == 2
+        params = [c.args[1] for c in cursor.execute.call_args_list]
+        assert params[0] == ("transactions_20240115.csv", "transactions")
+        assert "ON CONFLICT (file_name) DO NOTHING" in cursor.execute.call_args[0][0]
+
+    def test_enqueue_nothing(self, queue, cursor):
+        assert queue.enqueue({"transactions": []}) == 0
+        cursor.execute.assert_not_called()
+
+    def test_claim(self, queue, cursor):
+        """Claims should skip locked rows and record the worker."""
+        cursor.fetchone.return_value = ("transactions_20240115.csv", "transactions")
+        assert queue.claim() == ("transactions_20240115.csv", "transactions")
+        statement, params = cursor.execute.call_args[0]
+        assert "FOR UPDATE SKIP LOCKED" in statement
+        assert params == ("worker-1", [])
+
+    def test_claim_empty(self, queue, cursor):
+        cursor.fetchone.return_value = None
+        assert queue.claim() is None
+
+    def test_release_stale(self, queue, cursor):
+        """Stale claims should be released with the configured limits."""
+        cursor.rowcount = 2
+        assert queue.release_stale(timeout_seconds=60) == 2
+        statement, params = cursor.execute.call_args[0]
+        assert "heartbeat_at < NOW()" in statement
+        assert params[1] == 60
+
+    def test_finish_scoped_to_worker(self, queue, cursor, caplog):
+        """Finishing should only touch claims held by this worker."""
+        cursor.rowcount = 0
+        queue.complete(Path("transactions_20240115.csv"))
+        _, params = cursor.execute.call_args[0]
+        assert params == ("done", None, "transactions_20240115.csv", "worker-1")
+        assert "was lost" in caplog.text
+
+    def test_retry_later(self, queue, cursor, monkeypatch):
+        """Transient failures should return the file, bounded by attempts."""
+        monkeypatch.setattr(
+            "pipeline.work_queue.config", PipelineConfig(max_claim_attempts=5)
+        )
+        cursor.rowcount = 1
+        queue.retry_later(Path("transactions_20240115.csv"), "connection lost")
+        statement, params = cursor.execute.call_args[0]
+        assert "THEN 'failed' ELSE 'pending'" in statement
+        assert "claimed_by  = NULL" in statement
+        assert params == (
+            5, "connection lost", 5, "transactions_20240115.csv", "worker-1",
+        )
+
+        cursor.fetchone.return_value = None
+        queue.claim()
+        _, params = cursor.execute.call_args[0]
+        assert params == ("worker-1", ["transactions_20240115.csv"])
+
+    def test_errors_wrapped(self, queue, cursor):
+        cursor.execute.side_effect = psycopg2.OperationalError("gone")
+        with pytest.raises(LoadError) as excinfo:
+            queue.claim()
+        assert excinfo.value.table == "file_queue"
+
+
+class TestKeepAlive:
+    """Tests for the background heartbeat."""
+
+    def test_reconnects_then_signals_lost_claim(self, queue, mocker):
+        """A failed heartbeat should be retried; a lost claim should be signalled."""
+        conn = mocker.MagicMock()
+        beat_cursor = conn.cursor.return_value.__enter__.return_value
+        type(beat_cursor).rowcount = property(
+            lambda _, counts=iter([1, 0]): next(counts)
+        )
+        connect = mocker.patch(
+            "pipeline.work_queue.psycopg2.connect",
+            side_effect=[psycopg2.OperationalError("blip"), conn],
+        )
+
+        with queue.keep_alive(Path("f.csv"), interval_seconds=0.01) as lost:
+            assert lost.wait(timeout=5)
+        assert connect.call_count == 2
+        conn.close.assert_called_once()
+
+    def test_check_claim(self):
+        lost = threading.Event()
+        check_claim(Path("f.csv"), lost)
+        lost.set()
+        with pytest.raises(ClaimLostError):
+            check_claim(Path("f.csv"), lost)